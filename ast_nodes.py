@@ -1,38 +1,70 @@
+from sys import intern
+
+__all__ = [
+    "ASTNode", "Program", "VarAssign", "Literal", "Var", "Binary", "CompareChain", "Unary", "Call", "NamedArg",
+    "Block", "If", "While", "Stop", "Continue", "FuncDef", "Return", "Import", "Export", "Trace",
+    "ListLiteral", "ListAccess", "SetListItem", "AddListItem", "RemoveListItem", "For",
+    "Match", "DictLiteral", "IndexAccess",
+]
+
+
 class ASTNode:
-    # Optional source line (1-based). Parser may set this.
-    line: int | None = None
+    # Optional source line (1-based). Parser may set this; read it with
+    # getattr(node, "line", None) since the slot starts out unset.
+    # Subclasses set __match_args__ = __slots__ (constructor order) for positional match patterns.
+    __slots__ = ("line",)
 
 
 class Program(ASTNode):
+    __slots__ = ("statements",)
+    __match_args__ = __slots__
+
     def __init__(self, statements):
         self.statements = statements
 
 
 class VarAssign(ASTNode):
+    __slots__ = ("name", "var_type", "value")
+    __match_args__ = __slots__
+
     def __init__(self, name, var_type, value):
-        self.name = name          # variable name
-        self.var_type = var_type  # s, i, f, b
+        self.name = intern(name)              # variable name
+        self.var_type = intern(var_type)      # s, i, f, b
         self.value = value        # expression
 
 
 class Literal(ASTNode):
+    __slots__ = ("value", "is_format")
+    __match_args__ = ("value",)
+
     def __init__(self, value):
         self.value = value
+        # strings containing braces are format strings, interpolated at runtime
+        self.is_format = isinstance(value, str) and ("{" in value or "}" in value)
 
 
 class Var(ASTNode):
+    __slots__ = ("name",)
+    __match_args__ = __slots__
+
     def __init__(self, name):
-        self.name = name
+        self.name = intern(name)
 
 
 class Binary(ASTNode):
+    __slots__ = ("left", "op", "right")
+    __match_args__ = __slots__
+
     def __init__(self, left, op, right):
         self.left = left
-        self.op = op
+        self.op = intern(op)
         self.right = right
 
 
 class CompareChain(ASTNode):
+    __slots__ = ("first", "ops", "rest")
+    __match_args__ = __slots__
+
     def __init__(self, first, ops, rest):
         # Represents: first (ops[0]) rest[0] (ops[1]) rest[1] ...
         # first: expr, ops: list[str], rest: list[expr]
@@ -42,29 +74,44 @@ class CompareChain(ASTNode):
 
 
 class Unary(ASTNode):
+    __slots__ = ("op", "expr")
+    __match_args__ = __slots__
+
     def __init__(self, op, expr):
-        self.op = op
+        self.op = intern(op)
         self.expr = expr
 
 
 class Call(ASTNode):
+    __slots__ = ("name", "args")
+    __match_args__ = __slots__
+
     def __init__(self, name, args):
-        self.name = name
+        self.name = intern(name)
         self.args = args
 
 
 class NamedArg(ASTNode):
+    __slots__ = ("name", "value_expr")
+    __match_args__ = __slots__
+
     def __init__(self, name, value_expr):
-        self.name = name
+        self.name = intern(name)
         self.value_expr = value_expr
 
 
 class Block(ASTNode):
+    __slots__ = ("statements",)
+    __match_args__ = __slots__
+
     def __init__(self, statements):
         self.statements = statements
 
 
 class If(ASTNode):
+    __slots__ = ("condition", "then_block", "else_block")
+    __match_args__ = __slots__
+
     def __init__(self, condition, then_block, else_block=None):
         self.condition = condition
         self.then_block = then_block
@@ -72,6 +119,9 @@ class If(ASTNode):
 
 
 class While(ASTNode):
+    __slots__ = ("condition", "body", "else_block")
+    __match_args__ = __slots__
+
     def __init__(self, condition, body, else_block=None):
         self.condition = condition
         self.body = body
@@ -79,81 +129,119 @@ class While(ASTNode):
 
 
 class Stop(ASTNode):
-    pass
+    __slots__ = ()
+    __match_args__ = __slots__
 
 
 class Continue(ASTNode):
-    pass
+    __slots__ = ()
+    __match_args__ = __slots__
 
 
 class FuncDef(ASTNode):
+    __slots__ = ("name", "params", "body", "return_type")
+    __match_args__ = __slots__
+
     def __init__(self, name, params, body, return_type=None):
-        self.name = name
+        self.name = intern(name)
         self.params = params  # list of (param_name, param_type)
         self.body = body      # Block
-        self.return_type = return_type
+        self.return_type = intern(return_type) if return_type is not None else None
 
 
 class Return(ASTNode):
+    __slots__ = ("expr",)
+    __match_args__ = __slots__
+
     def __init__(self, expr):
         self.expr = expr
 
 
 class Import(ASTNode):
+    __slots__ = ("path_literal", "alias")
+    __match_args__ = __slots__
+
     def __init__(self, path_literal, alias: str | None = None):
         self.path_literal = path_literal
-        self.alias = alias
+        self.alias = intern(alias) if alias is not None else None
 
 
 class Export(ASTNode):
+    __slots__ = ("name",)
+    __match_args__ = __slots__
+
     def __init__(self, name):
-        self.name = name
+        self.name = intern(name)
 
 
 class Trace(ASTNode):
+    __slots__ = ("enabled",)
+    __match_args__ = __slots__
+
     def __init__(self, enabled: bool):
         self.enabled = enabled
 
 
 class ListLiteral(ASTNode):
+    __slots__ = ("items",)
+    __match_args__ = __slots__
+
     def __init__(self, items):
         self.items = items  # list[expr]
 
 
 class ListAccess(ASTNode):
+    __slots__ = ("name", "index_expr")
+    __match_args__ = __slots__
+
     def __init__(self, name, index_expr=None):
-        self.name = name
+        self.name = intern(name)
         self.index_expr = index_expr  # expr | None
 
 
 class SetListItem(ASTNode):
+    __slots__ = ("name", "index_expr", "value_expr")
+    __match_args__ = __slots__
+
     def __init__(self, name, index_expr, value_expr):
-        self.name = name
+        self.name = intern(name)
         self.index_expr = index_expr
         self.value_expr = value_expr
 
 
 class AddListItem(ASTNode):
+    __slots__ = ("name", "value_expr")
+    __match_args__ = __slots__
+
     def __init__(self, name, value_expr):
-        self.name = name
+        self.name = intern(name)
         self.value_expr = value_expr
 
 
 class RemoveListItem(ASTNode):
+    __slots__ = ("name", "index_expr")
+    __match_args__ = __slots__
+
     def __init__(self, name, index_expr):
-        self.name = name
+        self.name = intern(name)
         self.index_expr = index_expr
 
 
 class For(ASTNode):
+    __slots__ = ("var_name", "iterable_expr", "body", "else_block")
+    __match_args__ = __slots__
+
     def __init__(self, var_name, iterable_expr, body, else_block=None):
-        self.var_name = var_name
+        self.var_name = intern(var_name)
         self.iterable_expr = iterable_expr
         self.body = body
         self.else_block = else_block
 
 
 class Match(ASTNode):
+    __slots__ = ("expr", "cases", "else_block")
+    __match_args__ = __slots__
+
     def __init__(self, expr, cases, else_block=None):
         self.expr = expr
         self.cases = cases  # list[(literal_value, Block)]
@@ -161,12 +249,18 @@ class Match(ASTNode):
 
 
 class DictLiteral(ASTNode):
+    __slots__ = ("pairs",)
+    __match_args__ = __slots__
+
     def __init__(self, pairs):
         self.pairs = pairs  # list[(Literal(str), expr)]
 
 
 class IndexAccess(ASTNode):
+    __slots__ = ("name", "key_expr")
+    __match_args__ = __slots__
+
     def __init__(self, name, key_expr=None):
-        self.name = name
+        self.name = intern(name)
         self.key_expr = key_expr  # expr | None
 
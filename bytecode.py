@@ -1,27 +1,90 @@
+import math
+from array import array
+from typing import NamedTuple
+
+from opcodes import Op
+
+# Bump whenever the emitted bytecode format changes (invalidates cli.py's on-disk cache).
+# Kept here rather than in compiler.py so a cache hit doesn't load the compiler.
+COMPILER_VERSION = 19
+
+
+def const_key(value):
+    # Dedup key for the constant pool. Equal-but-different values (1, 1.0, True, 0.0/-0.0)
+    # must not share a slot, so the type (and float sign) is part of the key.
+    # Raises TypeError for unhashable values.
+    t = type(value)
+    if t is float:
+        return (t, value, math.copysign(1.0, value))
+    if t is tuple:
+        return (t, tuple(const_key(v) for v in value))
+    hash(value)
+    return (t, value)
+
+
+# opcode name -> int, so emit() avoids the Enum metaclass lookup (Op[name]) per instruction
+_OP_VALUES = {op.name: op.value for op in Op}
+
+
+class FuncMeta(NamedTuple):
+    entry: int | None        # instruction index of the body (None until compiled)
+    params: tuple            # parameter names, in order
+    defaults: dict           # param name -> literal default
+    return_type: str | None  # type code checked on RETURN
+    file: str | None         # source file the function was defined in
+    local_names: tuple       # LOAD_FAST/STORE_FAST slot -> variable name (params first)
+
+
 class BytecodeProgram:
+    # Pickled into the bytecode cache; pickle protocol 2+ handles __slots__.
+    __slots__ = ("consts", "_const_index", "opcodes", "args", "debug", "functions", "defined_globals", "exports")
+
     def __init__(self):
         self.consts = []         # constants like "big", 10, 5
-        self.instructions = []   # list of (OPCODE, arg)
-        self.debug = []          # list of debug dicts (e.g. {"file": str, "line": int}) aligned with instructions
-        self.functions = {}      # name -> {"entry": int, "params": [str, ...]}
+        self._const_index = {}   # const_key(value) -> index into consts
+        self.opcodes = array("B")  # Op value per instruction (one byte each)
+        self.args = []           # operand per instruction (parallel to opcodes)
+        self.debug = []          # list of debug dicts (e.g. {"file": str, "line": int}) aligned with opcodes
+        self.functions = {}      # name -> FuncMeta
 
         # Module metadata (used by VM import filtering)
         self.defined_globals = set()  # set[str]
         self.exports = set()          # set[str]
 
-    def add_const(self, value):
+    def add_const(self, value: object) -> int:
         # reuse constants if already added
-        if value in self.consts:
-            return self.consts.index(value)
-        self.consts.append(value)
-        return len(self.consts) - 1
+        try:
+            key = const_key(value)
+        except TypeError:
+            # unhashable (list/dict): store without dedup
+            self.consts.append(value)
+            return len(self.consts) - 1
+        idx = self._const_index.get(key)
+        if idx is None:
+            self.consts.append(value)
+            idx = len(self.consts) - 1
+            self._const_index[key] = idx
+        return idx
+
+    @property
+    def instructions(self):
+        # (OPCODE name, arg) view for printing/inspection; the VM reads opcodes/args directly.
+        return [(Op(op).name, arg) for op, arg in zip(self.opcodes, self.args)]
 
-    def emit(self, opcode, arg=None, debug=None):
+    def emit(self, opcode: Op | str, arg=None, debug: dict | None = None) -> int:
         # returns instruction index (useful for jumps)
-        self.instructions.append((opcode, arg))
+        if type(opcode) is str:
+            opcode = _OP_VALUES[opcode]
+        self.opcodes.append(opcode)
+        self.args.append(arg)
         self.debug.append(debug)
-        return len(self.instructions) - 1
+        return len(self.opcodes) - 1
+
+    def patch(self, index: int, arg) -> None:
+        self.args[index] = arg
 
-    def patch(self, index, arg):
-        opcode, _ = self.instructions[index]
-        self.instructions[index] = (opcode, arg)
+    def patch_many(self, indices, arg) -> None:
+        # point every jump in indices at the same target
+        args = self.args
+        for i in indices:
+            args[i] = arg
@@ -1,127 +1,125 @@
 import os
+import re
 import sys
-import traceback
 
-from vm import VM
-from compiler import Compiler
-from lexer import Lexer
-from parser import Parser
+# The front-end/VM modules (and traceback, pickle, hashlib) are imported inside the
+# commands that use them, so usage errors don't pay for loading them.
+from ast_nodes import (
+    ASTNode, Program, VarAssign, Var, Binary, Unary, Call, Block, If, While, Stop, Continue, FuncDef, Return,
+    Import,
+    ListLiteral, ListAccess, SetListItem, AddListItem, RemoveListItem, For,
+)
 
 
 # Simple AST printer (so you can SEE what the parser built)
-def ast_to_dict(node):
-    if node is None:
-        return None
-
-    t = node.__class__.__name__
-    d = {"type": t}
-
-    if t == "Program":
-        d["statements"] = [ast_to_dict(s) for s in node.statements]
-    elif t == "VarAssign":
-        d["name"] = node.name
-        d["var_type"] = node.var_type
-        d["value"] = ast_to_dict(node.value)
-    elif t == "Var":
-        d["name"] = node.name
-    elif t == "Binary":
-        d["op"] = node.op
-        d["left"] = ast_to_dict(node.left)
-        d["right"] = ast_to_dict(node.right)
-    elif t == "Unary":
-        d["op"] = node.op
-        d["expr"] = ast_to_dict(node.expr)
-    elif t == "Call":
-        d["name"] = node.name
-        d["args"] = [ast_to_dict(a) for a in node.args]
-    elif t == "ListLiteral":
-        d["items"] = [ast_to_dict(i) for i in node.items]
-    elif t == "ListAccess":
-        d["name"] = node.name
-        d["index"] = ast_to_dict(node.index_expr)
-    elif t == "SetListItem":
-        d["name"] = node.name
-        d["index"] = ast_to_dict(node.index_expr)
-        d["value"] = ast_to_dict(node.value_expr)
-    elif t == "AddListItem":
-        d["name"] = node.name
-        d["value"] = ast_to_dict(node.value_expr)
-    elif t == "RemoveListItem":
-        d["name"] = node.name
-        d["index"] = ast_to_dict(node.index_expr)
-    elif t == "Block":
-        d["statements"] = [ast_to_dict(s) for s in node.statements]
-    elif t == "If":
-        d["condition"] = ast_to_dict(node.condition)
-        d["then_block"] = ast_to_dict(node.then_block)
-        d["else_block"] = ast_to_dict(node.else_block)
-    elif t == "While":
-        d["condition"] = ast_to_dict(node.condition)
-        d["body"] = ast_to_dict(node.body)
-    elif t == "For":
-        d["var_name"] = node.var_name
-        d["iterable"] = ast_to_dict(node.iterable_expr)
-        d["body"] = ast_to_dict(node.body)
-    elif t == "Stop":
-        pass
-    elif t == "Continue":
-        pass
-    elif t == "FuncDef":
-        d["name"] = node.name
-        d["params"] = list(node.params)
-        d["body"] = ast_to_dict(node.body)
-    elif t == "Return":
-        d["expr"] = ast_to_dict(node.expr)
-    elif t == "Import":
-        d["path"] = node.path_literal
-        d["alias"] = getattr(node, "alias", None)
 
-    else:
-        d["raw"] = str(node)
 
-    return d
+def print_ast(node, buf, indent=0):
+    # One "key: value" line per field, nested nodes and list items indented under their key.
+    sp = "  " * indent
+    match node:
+        case None:
+            buf.append(f"{sp}None")
+            return
+        case Program(statements):
+            fields = (("statements", statements),)
+        case VarAssign(name, var_type, value):
+            fields = (("name", name), ("var_type", var_type), ("value", value))
+        case Var(name):
+            fields = (("name", name),)
+        case Binary(left, op, right):
+            fields = (("op", op), ("left", left), ("right", right))
+        case Unary(op, expr):
+            fields = (("op", op), ("expr", expr))
+        case Call(name, args):
+            fields = (("name", name), ("args", args))
+        case ListLiteral(items):
+            fields = (("items", items),)
+        case ListAccess(name, index_expr):
+            fields = (("name", name), ("index", index_expr))
+        case SetListItem(name, index_expr, value_expr):
+            fields = (("name", name), ("index", index_expr), ("value", value_expr))
+        case AddListItem(name, value_expr):
+            fields = (("name", name), ("value", value_expr))
+        case RemoveListItem(name, index_expr):
+            fields = (("name", name), ("index", index_expr))
+        case Block(statements):
+            fields = (("statements", statements),)
+        case If(condition, then_block, else_block):
+            fields = (("condition", condition), ("then_block", then_block), ("else_block", else_block))
+        case While(condition, body):
+            fields = (("condition", condition), ("body", body))
+        case For(var_name, iterable_expr, body):
+            fields = (("var_name", var_name), ("iterable", iterable_expr), ("body", body))
+        case Stop() | Continue():
+            fields = ()
+        case FuncDef(name, params, body):
+            fields = (("name", name), ("params", list(params)), ("body", body))
+        case Return(expr):
+            fields = (("expr", expr),)
+        case Import(path_literal):
+            fields = (("path", path_literal), ("alias", getattr(node, "alias", None)))
+        case _:
+            fields = (("raw", str(node)),)
+
+    buf.append(f"{sp}type: {type(node).__name__}")
+    inner = indent + 1
+    for key, value in fields:
+        if isinstance(value, ASTNode):
+            buf.append(f"{sp}{key}:")
+            print_ast(value, buf, inner)
+        elif isinstance(value, list):
+            buf.append(f"{sp}{key}:")
+            if not value:
+                buf.append("")
+            item_sp = "  " * (inner + 1)
+            for item in value:
+                buf.append(f"{sp}  -")
+                if item is None or isinstance(item, ASTNode):
+                    print_ast(item, buf, inner + 1)
+                else:
+                    buf.append(f"{item_sp}{item}")
+        else:
+            buf.append(f"{sp}{key}: {value}")
 
 
-def pretty(obj, indent=0):
-    sp = "  " * indent
-    if isinstance(obj, dict):
-        lines = []
-        for k, v in obj.items():
-            if isinstance(v, (dict, list)):
-                lines.append(f"{sp}{k}:")
-                lines.append(pretty(v, indent + 1))
-            else:
-                lines.append(f"{sp}{k}: {v}")
-        return "\n".join(lines)
-    if isinstance(obj, list):
-        lines = []
-        for item in obj:
-            lines.append(f"{sp}-")
-            lines.append(pretty(item, indent + 1))
-        return "\n".join(lines)
-    return f"{sp}{obj}"
+def _read_source(path: str) -> str:
+    # Read bytes and decode once instead of going through the incremental text layer.
+    with open(path, "rb") as f:
+        code = f.read().decode("utf-8")
+    # Keep text-mode newline handling: \r\n and lone \r become \n.
+    if "\r" in code:
+        code = code.replace("\r\n", "\n").replace("\r", "\n")
+    return code
 
 
 def cmd_parse(path):
+    from lexer import Lexer
+    from parser import Parser
+
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            code = f.read()
+        code = _read_source(path)
 
         lexer = Lexer(code)
         parser = Parser(lexer)
         program = parser.parse()
 
-        tree = ast_to_dict(program)
-        print(pretty(tree))
+        buf = []
+        print_ast(program, buf)
+        buf.append("")
+        sys.stdout.write("\n".join(buf))
     except Exception as e:
         print(f"Parse error: {e}")
         sys.exit(1)
 
 
 def cmd_build(path):
+    from compiler import Compiler
+    from lexer import Lexer
+    from parser import Parser
+
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            code = f.read()
+        code = _read_source(path)
 
         lexer = Lexer(code)
         parser = Parser(lexer)
@@ -133,46 +131,50 @@ def cmd_build(path):
         print(f"Build error: {e}")
         sys.exit(1)
 
-    print("CONSTS:")
-    for i, c in enumerate(bc.consts):
-        print(f"  [{i}] {c}")
+    out = ["CONSTS:"]
+    out.extend(f"  [{i}] {c}" for i, c in enumerate(bc.consts))
 
     if getattr(bc, "functions", None):
-        print("\nFUNCTIONS:")
-        for name, meta in bc.functions.items():
-            print(f"  {name}  entry={meta.get('entry')}  params={meta.get('params')}")
+        out.append("\nFUNCTIONS:")
+        out.extend(
+            f"  {name}  entry={meta.entry}  params={list(meta.params)}"
+            for name, meta in bc.functions.items()
+        )
+
+    out.append("\nINSTRUCTIONS:")
+    out.extend(f"  {i:04d}  {ins}" for i, ins in enumerate(bc.instructions))
+    out.append("")
+    # one write instead of a print per line
+    sys.stdout.write("\n".join(out))
 
-    print("\nINSTRUCTIONS:")
-    for i, ins in enumerate(bc.instructions):
-        print(f"  {i:04d}  {ins}")
+
+# Strings (with escapes) and comments are matched whole so only real braces land in group 1.
+# The closing quote is optional: an unterminated string swallows the rest of the line.
+_BRACE_RE = re.compile(r"'(?:[^'\\]|\\.)*'?|\"(?:[^\"\\]|\\.)*\"?|#[^\n]*|([{}])")
 
 
 def _count_braces_delta(line: str) -> int:
     # Minimal brace balancer for REPL multiline input.
-    # Ignores braces inside "..." or '...' strings (best-effort; no escape handling).
+    # Ignores braces inside "..." or '...' strings and after a # comment.
     delta = 0
-    in_single = False
-    in_double = False
-    i = 0
-    while i < len(line):
-        ch = line[i]
-        if ch == "#" and not in_single and not in_double:
-            break
-        if ch == "'" and not in_double:
-            in_single = not in_single
-        elif ch == '"' and not in_single:
-            in_double = not in_double
-        elif not in_single and not in_double:
-            if ch == "{":
-                delta += 1
-            elif ch == "}":
-                delta -= 1
-        i += 1
+    for m in _BRACE_RE.finditer(line):
+        brace = m.group(1)
+        if brace == "{":
+            delta += 1
+        elif brace == "}":
+            delta -= 1
     return delta
 
 
 def cmd_repl(debug: bool = False):
-    # Create an initial empty VM and keep it alive across snippets.
+    import traceback
+
+    from compiler import Compiler
+    from lexer import Lexer
+    from parser import Parser
+    from vm import VM
+
+    # Create an initial empty VM and keep it (and the compiler) alive across snippets.
     try:
         lexer = Lexer("")
         parser = Parser(lexer)
@@ -228,8 +230,6 @@ def cmd_repl(debug: bool = False):
             except Exception as parse_err:
                 # If that fails, try parsing as a single expression and auto-print it.
                 try:
-                    from ast_nodes import Program, Call
-
                     lexer = Lexer(source)
                     parser = Parser(lexer)
                     expr = parser.expr()
@@ -240,20 +240,23 @@ def cmd_repl(debug: bool = False):
                 except Exception:
                     raise parse_err
 
-            compiler = Compiler(source_path="<repl>")
+            compiler.reset_for_snippet()
             bc = compiler.compile(program)
 
             start_ip, end_ip = vm.link_bytecode(bc)
             saved_env = vm.env
+            saved_fast, saved_fast_names = vm.fast, vm.fast_names
             saved_func = vm.current_function_name
             saved_file = vm.current_file_path
             vm.env = vm.globals
+            vm.fast, vm.fast_names = None, ()
             vm.current_function_name = "<repl>"
             vm.current_file_path = "<repl>"
             try:
                 vm.run_range(start_ip, end_ip)
             finally:
                 vm.env = saved_env
+                vm.fast, vm.fast_names = saved_fast, saved_fast_names
                 vm.current_function_name = saved_func
                 vm.current_file_path = saved_file
         except Exception as e:
@@ -321,19 +324,88 @@ def main():
         sys.exit(1)
 
     
+def _bytecode_cache_path(abs_path: str, code: str) -> str:
+    import hashlib
+
+    # Cache lives next to the source: __fallencache__/<name>.<hash>.pkl
+    key = f"{abs_path}\0{code}".encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+    cache_dir = os.path.join(os.path.dirname(abs_path), "__fallencache__")
+    return os.path.join(cache_dir, f"{os.path.basename(abs_path)}.{digest}.pkl")
+
+
+def _load_cached_bytecode(cache_path: str):
+    import pickle
+
+    from bytecode import COMPILER_VERSION
+
+    # Any problem reading the cache just means we compile again.
+    try:
+        with open(cache_path, "rb") as f:
+            version, bc = pickle.load(f)
+    except Exception:
+        return None
+    if version != COMPILER_VERSION:
+        return None
+    return bc
+
+
+def _store_cached_bytecode(cache_path: str, bc):
+    import pickle
+
+    from bytecode import COMPILER_VERSION
+
+    # Best-effort: write to a temp file and rename so readers never see a partial pickle.
+    cache_dir = os.path.dirname(cache_path)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((COMPILER_VERSION, bc), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+
+    # Drop entries for older versions of the same source file.
+    prefix = os.path.basename(cache_path).rsplit(".", 2)[0] + "."
+    keep = os.path.basename(cache_path)
+    try:
+        for name in os.listdir(cache_dir):
+            if name != keep and name.startswith(prefix) and name.endswith(".pkl"):
+                os.remove(os.path.join(cache_dir, name))
+    except OSError:
+        pass
+
+
 def cmd_run(path, debug: bool = False, argv=None):
+    import traceback
+
+    from vm import VM
+
     vm = None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            code = f.read()
-
-        lexer = Lexer(code)
-        parser = Parser(lexer)
-        program = parser.parse()
+        code = _read_source(path)
 
         abs_path = os.path.abspath(path)
-        compiler = Compiler(source_path=abs_path)
-        bc = compiler.compile(program)
+        cache_path = _bytecode_cache_path(abs_path, code)
+        bc = _load_cached_bytecode(cache_path)
+        if bc is None:
+            # front end only on a cache miss
+            from compiler import Compiler
+            from lexer import Lexer
+            from parser import Parser
+
+            lexer = Lexer(code)
+            parser = Parser(lexer)
+            program = parser.parse()
+
+            compiler = Compiler(source_path=abs_path)
+            bc = compiler.compile(program)
+            _store_cached_bytecode(cache_path, bc)
 
         base_dir = os.path.dirname(os.path.abspath(path))
         vm = VM(bc, base_dir=base_dir, entry_file=abs_path, argv=argv)
@@ -1,6 +1,11 @@
-from bytecode import BytecodeProgram
+from array import array
+from sys import intern
+
+from bytecode import BytecodeProgram, FuncMeta
+from opcodes import JUMP_OPS, Op
+from optimize import fold_constants
 from ast_nodes import (
-    Program, VarAssign, Literal, Var, Binary, Unary, Call, Block, If, While, Stop, Continue, FuncDef, Return,
+    ASTNode, Program, VarAssign, Literal, Var, Binary, Unary, Call, Block, If, While, Stop, Continue, FuncDef, Return,
     Import,
     Export,
     Trace,
@@ -11,41 +16,231 @@ from ast_nodes import (
 )
 
 
+# Builtin name -> required argument count (None = any). Builtins never take named args.
+_BUILTIN_SPEC = {
+    "write": None,
+    "enter": 1,
+    # () -> list of CLI/script arguments
+    "args": 0,
+    # conversions
+    "conv_int": 1, "conv_float": 1, "conv_bool": 1,
+    "try_conv_int": 1, "try_conv_float": 1, "try_conv_bool": 1,
+    # lists/strings
+    "amount": 1, "del": 1, "upper": 1, "lower": 1,
+    "split": 2, "join": 2,
+    "replace": 3,
+    "insert": 3,
+    # file I/O
+    "save": 2, "append": 2, "change": 2,
+    "load": 1, "read": 1,
+}
+
+# Shared CALL_BUILTIN operands for the fixed-arity builtins (one tuple per builtin, not per call).
+_BUILTIN_CALL_ARGS = {name: (name, arity) for name, arity in _BUILTIN_SPEC.items() if arity is not None}
+
+
+# Statements after which the rest of a block is unreachable.
+_TERMINATORS = frozenset({Return, Stop, Continue})
+
+# Source operator -> opcode (Op values, so emit() needs no name lookup).
+_BINOP_OPCODES = {
+    "+": Op.ADD,
+    "-": Op.SUB,
+    "*": Op.MUL,
+    "/": Op.DIV,
+    "==": Op.CMP_EQ,
+    "!=": Op.CMP_NE,
+    "<": Op.CMP_LT,
+    "<=": Op.CMP_LE,
+    ">": Op.CMP_GT,
+    ">=": Op.CMP_GE,
+}
+
+# Builtins that can change a list's length; everything else in _BUILTIN_SPEC leaves lists alone.
+_RESIZING_BUILTINS = frozenset({"del", "insert"})
+
+
+def _may_resize_lists(node):
+    # Conservative: True if running this subtree could append/remove list items
+    # (directly, through a resizing builtin, or via user code: function calls, imports).
+    if isinstance(node, (list, tuple)):
+        return any(_may_resize_lists(x) for x in node)
+    if not isinstance(node, ASTNode):
+        return False
+    t = type(node)
+    if t is AddListItem or t is RemoveListItem or t is Import:
+        return True
+    if t is Call and (node.name in _RESIZING_BUILTINS or node.name not in _BUILTIN_SPEC):
+        return True
+    return any(_may_resize_lists(getattr(node, field, None)) for field in t.__slots__)
+
+
+def _assigned_names(node, out):
+    # Append every name a function body assigns (its locals), in source order.
+    if isinstance(node, (list, tuple)):
+        for x in node:
+            _assigned_names(x, out)
+        return
+    if not isinstance(node, ASTNode):
+        return
+    t = type(node)
+    if t is FuncDef:
+        return
+    if t is VarAssign or t is For:
+        out.append(node.name if t is VarAssign else node.var_name)
+    for field in t.__slots__:
+        _assigned_names(getattr(node, field, None), out)
+
+
+def _is_plain_literal(node):
+    # A literal that compiles to a bare LOAD_CONST (strings with braces are format strings).
+    return type(node) is Literal and not node.is_format
+
+
+class LoopFrame:
+    # Jump bookkeeping for one enclosing while/for while its body is compiled.
+    __slots__ = ("start", "break_jumps", "continue_jumps", "continue_target")
+
+    def __init__(self, start, continue_target):
+        self.start = start
+        self.break_jumps = []      # stop: JUMP indices patched to the loop end
+        self.continue_jumps = []   # continue: JUMP indices patched to continue_target
+        self.continue_target = continue_target
+
+
 class Compiler:
+    __slots__ = (
+        "bc", "loop_stack", "_current_loop", "in_function", "_tmp_id",
+        "_fast", "_fast_names", "_k_zero", "_k_none", "source_path", "_debug_cache",
+        "_stmt_handlers", "_expr_handlers",
+    )
+
     def __init__(self, source_path: str | None = None):
         self.bc = BytecodeProgram()
         self.loop_stack = []
+        self._current_loop = None  # == loop_stack[-1] (None outside loops)
         self.in_function = 0
         self._tmp_id = 0
+        self._fast = None  # name -> LOAD_FAST/STORE_FAST slot while compiling a function body
+        self._fast_names = []  # slot -> name for the function being compiled
+        self._k_zero = self._k_none = None  # const indices, set per program in compile()
         self.source_path = source_path
+        self._debug_cache = {}  # (source_path, line) -> debug dict (or None)
+
+        # type(node) -> handler; node classes are never subclassed, so exact type is enough.
+        self._stmt_handlers = {
+            Import: self.compile_import,
+            Export: self.compile_export,
+            Trace: self.compile_trace,
+            VarAssign: self.compile_var_assign,
+            Return: self.compile_return_stmt,
+            FuncDef: lambda node: None,  # function bodies are compiled in pass 1
+            While: self.compile_while,
+            Match: self.compile_match,
+            For: self.compile_for,
+            SetListItem: self.compile_set_list_item,
+            AddListItem: self.compile_add_list_item,
+            RemoveListItem: self.compile_remove_list_item,
+            Call: self.compile_call_stmt,
+            If: self.compile_if,
+            Stop: self.compile_stop,
+            Continue: self.compile_continue,
+        }
+        self._expr_handlers = {
+            Literal: self.compile_literal,
+            ListLiteral: self.compile_list_literal,
+            DictLiteral: self.compile_dict_literal,
+            Var: self.compile_var,
+            ListAccess: self.compile_list_access,
+            IndexAccess: self.compile_index_access,
+            Binary: self.compile_binary,
+            CompareChain: self.compile_compare_chain,
+            Unary: self.compile_unary,
+            Call: self.compile_call,
+        }
+
+    def reset_for_snippet(self):
+        # Reuse this compiler for another top-level program (REPL). Linking copies the
+        # previous snippet into the VM, so only a fresh output program is needed;
+        # constant dedup across snippets happens in VM.add_const.
+        self.bc = BytecodeProgram()
+        self.loop_stack = []
+        self._current_loop = None  # == loop_stack[-1] (None outside loops)
+        self.in_function = 0
+        self._fast = None
 
     def _debug_for(self, node):
         line = getattr(node, "line", None)
-        if self.source_path is None and line is None:
-            return None
-        dbg = {}
-        if self.source_path is not None:
-            dbg["file"] = self.source_path
-        if line is not None:
-            dbg["line"] = line
+        # One shared dict per (file, line); consumers only ever read these.
+        key = (self.source_path, line)
+        if key in self._debug_cache:
+            return self._debug_cache[key]
+        dbg = None
+        if self.source_path is not None or line is not None:
+            dbg = {}
+            if self.source_path is not None:
+                dbg["file"] = self.source_path
+            if line is not None:
+                dbg["line"] = line
+        self._debug_cache[key] = dbg
         return dbg
 
-    def emit(self, opcode, arg=None, node=None):
-        return self.bc.emit(opcode, arg, debug=self._debug_for(node))
+    def emit(self, opcode: Op | str, arg=None, node=None) -> int:
+        # Hot path: the debug entry for this (file, line) is almost always cached already.
+        # (Nodes use __slots__, so the line is read with getattr rather than via __dict__.)
+        try:
+            dbg = self._debug_cache[(self.source_path, getattr(node, "line", None))]
+        except KeyError:
+            dbg = self._debug_for(node)
+        return self.bc.emit(opcode, arg, dbg)
+
+    def _emit_load(self, name, node):
+        # Function locals live in numbered slots; everything else is looked up by name.
+        fast = self._fast
+        if fast is not None and name in fast:
+            return self.emit("LOAD_FAST", fast[name], node)
+        return self.emit("LOAD_NAME", name, node)
+
+    def _emit_inc(self, name, node):
+        # name = name + 1 for compiler-owned int counters (already stored before this runs)
+        fast = self._fast
+        if fast is not None:
+            return self.emit("INC_FAST", fast[name], node)
+        return self.emit("INC_NAME", name, node)
+
+    def _emit_store(self, name, node):
+        fast = self._fast
+        if fast is not None:
+            slot = fast.get(name)
+            if slot is None:
+                # compiler temps get their slot on first store
+                slot = fast[name] = len(self._fast_names)
+                self._fast_names.append(name)
+            return self.emit("STORE_FAST", slot, node)
+        return self.emit("STORE_NAME", name, node)
 
     def compile(self, node):
         # entry point
         if not isinstance(node, Program):
             raise Exception("Compiler expects a Program node at the top")
 
+        fold_constants(node)
+
         # Ensure execution starts at top-level, not inside the first function body.
         main_jump_i = self.emit("JUMP", None, node)
 
-        # Pass 1: collect all function signatures (allow calls before definition).
+        # Constants every loop/function needs; looked up once per program.
+        self._k_zero = self.bc.add_const(0)
+        self._k_none = self.bc.add_const(None)
+
+        # Split once: function definitions vs. top-level code.
+        funcdefs = []
+        top_levels = []
         for stmt in node.statements:
-            if not isinstance(stmt, FuncDef):
-                continue
+            (funcdefs if type(stmt) is FuncDef else top_levels).append(stmt)
 
+        # Pass 1: collect all function signatures (allow calls before definition).
+        for stmt in funcdefs:
             if stmt.name in self.bc.functions:
                 raise Exception(f"Function already defined: {stmt.name}")
 
@@ -57,185 +252,215 @@ class Compiler:
                 if not isinstance(default_expr, Literal):
                     raise Exception(f"Default value for parameter '{pname}' must be a literal")
                 defaults[pname] = default_expr.value
-            self.bc.functions[stmt.name] = {
-                "entry": None,
-                "params": param_names,
-                "defaults": defaults,
-                "return_type": getattr(stmt, "return_type", None),
-                "file": self.source_path,
-            }
+            self.bc.functions[stmt.name] = FuncMeta(
+                None,
+                tuple(param_names),
+                defaults,
+                getattr(stmt, "return_type", None),
+                self.source_path,
+                (),
+            )
 
             # module-level symbol tracking
             self.bc.defined_globals.add(stmt.name)
 
         # Pass 2: compile all function bodies.
-        for stmt in node.statements:
-            if isinstance(stmt, FuncDef):
-                self.compile_funcdef(stmt)
+        for stmt in funcdefs:
+            self.compile_funcdef(stmt)
 
         # Patch main start address.
-        main_start = len(self.bc.instructions)
+        main_start = len(self.bc.opcodes)
         self.bc.patch(main_jump_i, main_start)
 
-        # Pass 2: compile top-level statements (skip FuncDef).
-        for stmt in node.statements:
-            if isinstance(stmt, FuncDef):
-                continue
+        # Pass 3: compile top-level statements.
+        for stmt in top_levels:
             self.compile_stmt(stmt)
 
         # Validate explicit exports (v0.1: only allow exporting module-defined symbols).
-        if self.bc.exports:
-            for name in self.bc.exports:
-                if name not in self.bc.defined_globals:
-                    raise Exception(f"exported name not defined in module: {name}")
+        bad = self.bc.exports - self.bc.defined_globals
+        if bad:
+            raise Exception(f"exported name(s) not defined in module: {', '.join(sorted(bad))}")
 
-        self.emit("HALT", node=node)
+        self._peephole()
+        self.emit("HALT", None, node)
         return self.bc
 
-    # -------- statements --------
-    def compile_stmt(self, node):
-        if isinstance(node, Import):
-            k = self.bc.add_const(node.path_literal)
-            self.emit("LOAD_CONST", k, node)
-            self.emit("IMPORT", getattr(node, "alias", None), node=node)
-            return
-
-        if isinstance(node, Export):
-            # No runtime behavior; metadata only.
-            if self.in_function != 0:
-                raise Exception("export is only allowed at top level")
-            self.bc.exports.add(node.name)
-            return
-
-        if isinstance(node, Trace):
-            self.emit("SET_TRACE", bool(node.enabled), node)
-            return
-
-        if isinstance(node, VarAssign):
-            # compile the value then store it
-            self.compile_expr(node.value)
-            self.emit("STORE_NAME", node.name, node)
-
-            # module-level symbol tracking
-            if self.in_function == 0:
-                self.bc.defined_globals.add(node.name)
-            return
-
-        if isinstance(node, Return):
-            if self.in_function == 0:
-                raise Exception("return used outside of a function")
-            self.compile_return(node)
-            return
-
-        if isinstance(node, FuncDef):
-            # function bodies are compiled in pass 1
-            return
-        if isinstance(node, While):
-            self.compile_while(node)
-            return
-
-        if isinstance(node, Match):
-            self.compile_match(node)
-            return
-
-        if isinstance(node, For):
-            self.compile_for(node)
-            return
-
-        if isinstance(node, SetListItem):
-            self.compile_set_list_item(node)
-            return
-
-        if isinstance(node, AddListItem):
-            self.compile_add_list_item(node)
-            return
+    def _peephole(self):
+        # Rewrite adjacent pairs, then renumber jumps and function entries:
+        #   LOAD_NAME x; STORE_NAME y  ->  MOVE_NAME (x, y)
+        #   LOAD_FAST a; STORE_FAST b  ->  MOVE_FAST (a, b)
+        #   LOAD_CONST k; POP          ->  (nothing)
+        # A pair is only touched when nothing jumps to its second instruction.
+        # (LOAD_NAME x; STORE_NAME x is not a no-op: in a function it copies a global into a local.)
+        bc = self.bc
+        ops, args, debug = bc.opcodes, bc.args, bc.debug
+        n = len(ops)
+
+        targets = {a for op, a in zip(ops, args) if op in JUMP_OPS}
+        for op, a in zip(ops, args):
+            if op == Op.SWITCH:
+                targets.update(a[0].values())
+                targets.add(a[1])
+        targets.update(meta.entry for meta in bc.functions.values() if meta.entry is not None)
+
+        new_ops = array("B")
+        new_args = []
+        new_debug = []
+        remap = [0] * (n + 1)  # old index -> new index (removed instructions map to what follows)
+        i = 0
+        while i < n:
+            op = ops[i]
+            remap[i] = len(new_ops)
+            if i + 1 < n and i + 1 not in targets:
+                nxt = ops[i + 1]
+                if (op == Op.LOAD_NAME and nxt == Op.STORE_NAME) or (op == Op.LOAD_FAST and nxt == Op.STORE_FAST):
+                    remap[i + 1] = len(new_ops)
+                    new_ops.append(Op.MOVE_NAME if op == Op.LOAD_NAME else Op.MOVE_FAST)
+                    new_args.append((args[i], args[i + 1]))
+                    new_debug.append(debug[i])
+                    i += 2
+                    continue
+                if op == Op.LOAD_CONST and nxt == Op.POP:
+                    remap[i + 1] = len(new_ops)
+                    i += 2
+                    continue
+            new_ops.append(op)
+            new_args.append(args[i])
+            new_debug.append(debug[i])
+            i += 1
+        remap[n] = len(new_ops)
 
-        if isinstance(node, RemoveListItem):
-            self.compile_remove_list_item(node)
+        if len(new_ops) == n:
             return
 
-        if isinstance(node, Call):
-            self.compile_call(node)
-            # Standalone user-function calls should not leave return values on the stack.
-            if node.name != "write":
-                self.emit("POP", node=node)
-            return
+        for j, op in enumerate(new_ops):
+            if op in JUMP_OPS:
+                new_args[j] = remap[new_args[j]]
+            elif op == Op.SWITCH:
+                table, default = new_args[j]
+                new_args[j] = ({k: remap[t] for k, t in table.items()}, remap[default])
+        for name, meta in bc.functions.items():
+            if meta.entry is not None:
+                bc.functions[name] = meta._replace(entry=remap[meta.entry])
 
-        if isinstance(node, If):
-            self.compile_if(node)
-            return
-        if isinstance(node, Stop):
-            self.compile_stop()
-            return
+        bc.opcodes = new_ops
+        bc.args = new_args
+        bc.debug = new_debug
 
-        if isinstance(node, Continue):
-            self.compile_continue()
-            return
-
-        raise Exception(f"Unknown statement node: {node.__class__.__name__}")
+    # -------- statements --------
+    def compile_stmt(self, node):
+        handler = self._stmt_handlers.get(type(node))
+        if handler is None:
+            raise Exception(f"Unknown statement node: {node.__class__.__name__}")
+        handler(node)
+
+    def compile_import(self, node):
+        k = self.bc.add_const(node.path_literal)
+        self.emit("LOAD_CONST", k, node)
+        self.emit("IMPORT", getattr(node, "alias", None), node)
+
+    def compile_export(self, node):
+        # No runtime behavior; metadata only.
+        if self.in_function != 0:
+            raise Exception("export is only allowed at top level")
+        self.bc.exports.add(node.name)
+
+    def compile_trace(self, node):
+        self.emit("SET_TRACE", bool(node.enabled), node)
+
+    def compile_var_assign(self, node):
+        # compile the value then store it
+        self.compile_expr(node.value)
+        self._emit_store(node.name, node)
+
+        # module-level symbol tracking
+        if self.in_function == 0:
+            self.bc.defined_globals.add(node.name)
+
+    def compile_return_stmt(self, node):
+        if self.in_function == 0:
+            raise Exception("return used outside of a function")
+        self.compile_return(node)
+
+    def compile_call_stmt(self, node):
+        if node.name not in _BUILTIN_SPEC:
+            # Standalone user-function call: CALL_VOID drops the return value itself.
+            self.compile_call(node, void=True)
+            return
+        self.compile_call(node)
+        if node.name != "write":
+            self.emit("POP", None, node)
 
     def compile_funcdef(self, node):
         if node.name not in self.bc.functions:
             raise Exception(f"Unknown function (internal): {node.name}")
-        if self.bc.functions[node.name].get("entry") is not None:
+        meta = self.bc.functions[node.name]
+        if meta.entry is not None:
             raise Exception(f"Function already compiled: {node.name}")
 
-        entry = len(self.bc.instructions)
-        self.bc.functions[node.name]["entry"] = entry
+        entry = len(self.bc.opcodes)
+
+        # Slots: parameters first (CALL_FUNC fills them in order), then every assigned name.
+        fast = {pname: i for i, pname in enumerate(meta.params)}
+        self._fast_names = names = list(meta.params)
+        assigned = []
+        _assigned_names(node.body, assigned)
+        for name in assigned:
+            if name not in fast:
+                fast[name] = len(names)
+                names.append(name)
+        self._fast = fast
 
         self.in_function += 1
         self.compile_block(node.body)
         self.in_function -= 1
 
         # Implicit return None if control reaches end of function.
-        none_k = self.bc.add_const(None)
-        self.emit("LOAD_CONST", none_k, node)
-        self.emit("RETURN", node=node)
+        self.emit("LOAD_CONST", self._k_none, node)
+        self.emit("RETURN", None, node)
+
+        self._fast = None
+        self.bc.functions[node.name] = meta._replace(entry=entry, local_names=tuple(names))
 
     def compile_return(self, node):
         self.compile_expr(node.expr)
-        self.emit("RETURN", node=node)
+        self.emit("RETURN", None, node)
     def compile_while(self, node):
-        loop_start = len(self.bc.instructions)
+        bc, emit = self.bc, self.emit
+        loop_start = len(bc.opcodes)
 
         # prepare loop frame
-        frame = {
-            "start": loop_start,
-            "break_jumps": [],
-            "continue_jumps": [],
-            "continue_target": loop_start,
-        }
-        self.loop_stack.append(frame)
+        frame = LoopFrame(loop_start, loop_start)
+        self._push_loop(frame)
 
         # condition
         self.compile_expr(node.condition)
-        jmp_end_i = self.emit("JUMP_IF_FALSE", None, node)
+        jmp_end_i = emit("JUMP_IF_FALSE", None, node)
 
         # body
         self.compile_block(node.body)
 
         # continue jumps go here
-        self.emit("JUMP", loop_start, node)
+        emit("JUMP", loop_start, node)
 
-        else_start = len(self.bc.instructions)
+        else_start = len(bc.opcodes)
         if getattr(node, "else_block", None) is not None:
             self.compile_block(node.else_block)
 
-        loop_end = len(self.bc.instructions)
+        loop_end = len(bc.opcodes)
 
         # condition-false exits go to else (if present) else end
-        self.bc.patch(jmp_end_i, else_start if getattr(node, "else_block", None) is not None else loop_end)
+        bc.patch(jmp_end_i, else_start if getattr(node, "else_block", None) is not None else loop_end)
 
         # patch breaks (stop) to end (skip else)
-        for jmp_i in frame["break_jumps"]:
-            self.bc.patch(jmp_i, loop_end)
+        bc.patch_many(frame.break_jumps, loop_end)
 
         # patch continue jumps
-        for jmp_i in frame["continue_jumps"]:
-            self.bc.patch(jmp_i, frame["continue_target"])
-        self.loop_stack.pop()
+        bc.patch_many(frame.continue_jumps, frame.continue_target)
+        self._pop_loop()
 
     def compile_for(self, node):
+        bc, emit = self.bc, self.emit
         # Strategy: evaluate iterable once into a temp name, then loop index from 0..amount(iterable)-1.
         # This reuses the loop stack so stop/continue work.
 
@@ -244,297 +469,340 @@ class Compiler:
 
         # tmp_iter = <iterable>
         self.compile_expr(node.iterable_expr)
-        self.emit("STORE_NAME", tmp_iter, node)
+        self._emit_store(tmp_iter, node)
 
         # tmp_i = 0
-        zero_k = self.bc.add_const(0)
-        self.emit("LOAD_CONST", zero_k, node)
-        self.emit("STORE_NAME", tmp_i, node)
+        emit("LOAD_CONST", self._k_zero, node)
+        self._emit_store(tmp_i, node)
 
-        loop_start = len(self.bc.instructions)
+        # The length is re-read every iteration so add/remove in the body is seen. When the
+        # body can't resize any list, read it once up front instead.
+        tmp_len = None
+        if not _may_resize_lists(node.body):
+            tmp_len = self._new_tmp("__for_len")
+            self._emit_load(tmp_iter, node)
+            emit("CALL_BUILTIN", _BUILTIN_CALL_ARGS["amount"], node)
+            self._emit_store(tmp_len, node)
 
-        frame = {
-            "start": loop_start,
-            "break_jumps": [],
-            "continue_jumps": [],
-            "continue_target": None,  # patched after we know where increment begins
-        }
-        self.loop_stack.append(frame)
+        loop_start = len(bc.opcodes)
+
+        frame = LoopFrame(loop_start, None)  # continue target patched once the increment is placed
+        self._push_loop(frame)
 
         # condition: tmp_i < amount(tmp_iter)
-        self.emit("LOAD_NAME", tmp_i, node)
-        self.emit("LOAD_NAME", tmp_iter, node)
-        self.emit("CALL_BUILTIN", ("amount", 1), node)
-        self.emit("CMP_LT", node=node)
-        jmp_end_i = self.emit("JUMP_IF_FALSE", None, node)
+        self._emit_load(tmp_i, node)
+        if tmp_len is not None:
+            self._emit_load(tmp_len, node)
+        else:
+            self._emit_load(tmp_iter, node)
+            emit("CALL_BUILTIN", _BUILTIN_CALL_ARGS["amount"], node)
+        emit("CMP_LT", None, node)
+        jmp_end_i = emit("JUMP_IF_FALSE", None, node)
 
         # loop var = call tmp_iter(tmp_i)
-        self.emit("LOAD_NAME", tmp_iter, node)
-        self.emit("LOAD_NAME", tmp_i, node)
-        self.emit("LIST_GET", node=node)
-        self.emit("STORE_NAME", node.var_name, node)
+        if self._can_fuse(tmp_iter):
+            self._emit_load(tmp_i, node)
+            emit("LOAD_LIST_GET", tmp_iter, node)
+        else:
+            self._emit_load(tmp_iter, node)
+            self._emit_load(tmp_i, node)
+            emit("LIST_GET", None, node)
+        self._emit_store(node.var_name, node)
 
         # body
         self.compile_block(node.body)
 
         # increment
-        increment_pos = len(self.bc.instructions)
-        frame["continue_target"] = increment_pos
-        one_k = self.bc.add_const(1)
-        self.emit("LOAD_NAME", tmp_i, node)
-        self.emit("LOAD_CONST", one_k, node)
-        self.emit("ADD", node=node)
-        self.emit("STORE_NAME", tmp_i, node)
+        increment_pos = len(bc.opcodes)
+        frame.continue_target = increment_pos
+        self._emit_inc(tmp_i, node)
 
-        self.emit("JUMP", loop_start, node)
+        emit("JUMP", loop_start, node)
 
-        else_start = len(self.bc.instructions)
+        else_start = len(bc.opcodes)
         if getattr(node, "else_block", None) is not None:
             self.compile_block(node.else_block)
 
-        loop_end = len(self.bc.instructions)
+        loop_end = len(bc.opcodes)
 
         # condition-false exits go to else (if present) else end
-        self.bc.patch(jmp_end_i, else_start if getattr(node, "else_block", None) is not None else loop_end)
+        bc.patch(jmp_end_i, else_start if getattr(node, "else_block", None) is not None else loop_end)
 
         # patch breaks (stop) to end (skip else)
-        for jmp_i in frame["break_jumps"]:
-            self.bc.patch(jmp_i, loop_end)
+        bc.patch_many(frame.break_jumps, loop_end)
 
-        for jmp_i in frame["continue_jumps"]:
-            self.bc.patch(jmp_i, frame["continue_target"])
+        bc.patch_many(frame.continue_jumps, frame.continue_target)
 
-        self.loop_stack.pop()
+        self._pop_loop()
+
+    def _can_fuse(self, target, *operands):
+        # The fused ops read the target by name after the operands, so only fuse when the
+        # operands can't raise or rebind anything: an undefined target must still be the
+        # error reported first. Function locals already load in one step.
+        if self._fast is not None and target in self._fast:
+            return False
+        return all(_is_plain_literal(op) for op in operands)
 
     def compile_set_list_item(self, node):
         # runtime-dispatched (list index int, dict key str)
-        self.emit("LOAD_NAME", node.name, node)
+        if self._can_fuse(node.name, node.index_expr, node.value_expr):
+            self.compile_expr(node.index_expr)
+            self.compile_expr(node.value_expr)
+            self.emit("LOAD_INDEX_SET", node.name, node)
+            return
+        self._emit_load(node.name, node)
         self.compile_expr(node.index_expr)
         self.compile_expr(node.value_expr)
-        self.emit("INDEX_SET", node=node)
+        self.emit("INDEX_SET", None, node)
 
     def compile_add_list_item(self, node):
-        self.emit("LOAD_NAME", node.name, node)
+        if self._can_fuse(node.name, node.value_expr):
+            self.compile_expr(node.value_expr)
+            self.emit("LOAD_APPEND", node.name, node)
+            return
+        self._emit_load(node.name, node)
         self.compile_expr(node.value_expr)
-        self.emit("LIST_APPEND", node=node)
+        self.emit("LIST_APPEND", None, node)
 
     def compile_remove_list_item(self, node):
         # runtime-dispatched (list index int, dict key str)
-        self.emit("LOAD_NAME", node.name, node)
+        if self._can_fuse(node.name, node.index_expr):
+            self.compile_expr(node.index_expr)
+            self.emit("LOAD_INDEX_REMOVE", node.name, node)
+            return
+        self._emit_load(node.name, node)
         self.compile_expr(node.index_expr)
-        self.emit("INDEX_REMOVE", node=node)
+        self.emit("INDEX_REMOVE", None, node)
 
     def compile_match(self, node):
-        # Evaluate match expression once into a temp, then compare against each literal.
-        tmp = self._new_tmp("__match_tmp")
+        # One SWITCH: a dict from case literal to block start. Case literals are
+        # int/float/str/bool, whose hashing agrees with CMP_EQ (1 == 1.0 == True), so
+        # keeping the first of equal cases gives the same result as comparing in order.
+        bc, emit = self.bc, self.emit
         self.compile_expr(node.expr)
-        self.emit("STORE_NAME", tmp, node)
+        switch_i = emit("SWITCH", None, node)
 
+        table = {}
         end_jumps = []
-
         for lit_value, block in node.cases:
-            self.emit("LOAD_NAME", tmp, node)
-            k = self.bc.add_const(lit_value)
-            self.emit("LOAD_CONST", k, node)
-            self.emit("CMP_EQ", node=node)
-            jmp_next_i = self.emit("JUMP_IF_FALSE", None, node)
-
+            table.setdefault(lit_value, len(bc.opcodes))
             self.compile_block(block)
-            end_jumps.append(self.emit("JUMP", None, node))
-
-            next_pos = len(self.bc.instructions)
-            self.bc.patch(jmp_next_i, next_pos)
+            end_jumps.append(emit("JUMP", None, node))
 
+        default_pos = len(bc.opcodes)
         if node.else_block is not None:
             self.compile_block(node.else_block)
 
-        end_pos = len(self.bc.instructions)
-        for jmp_i in end_jumps:
-            self.bc.patch(jmp_i, end_pos)
-
+        end_pos = len(bc.opcodes)
+        bc.patch(switch_i, (table, default_pos))
+        bc.patch_many(end_jumps, end_pos)
 
     def compile_block(self, block):
-        for stmt in block.statements:
+        stmts = block.statements
+        for i, stmt in enumerate(stmts):
             self.compile_stmt(stmt)
+            if type(stmt) in _TERMINATORS and i + 1 < len(stmts):
+                # anything after this in the block can never run
+                self._compile_discarded(lambda: self._compile_stmts(stmts[i + 1:]))
+                return
 
-    def compile_if(self, node):
-        # 1) compile condition (leaves true/false on stack)
-        self.compile_expr(node.condition)
-
-        # 2) jump to else if false (we patch the address later)
-        jmp_false_i = self.emit("JUMP_IF_FALSE", None, node)
-
-        # 3) then block
-        self.compile_block(node.then_block)
-
-        # 4) jump to end after then block
-        jmp_end_i = self.emit("JUMP", None, node)
+    def _compile_stmts(self, stmts):
+        for stmt in stmts:
+            self.compile_stmt(stmt)
 
-        # 5) patch false jump to "else start"
-        else_start = len(self.bc.instructions)
-        self.bc.patch(jmp_false_i, else_start)
+    def _compile_discarded(self, fn):
+        # Compile dead code (so it still gets the usual compile-time checks and module
+        # metadata), then drop the instructions it emitted.
+        mark = len(self.bc.opcodes)
+        saved = [(list(f.break_jumps), list(f.continue_jumps)) for f in self.loop_stack]
+        fn()
+        del self.bc.opcodes[mark:]
+        del self.bc.args[mark:]
+        del self.bc.debug[mark:]
+        for frame, (breaks, continues) in zip(self.loop_stack, saved):
+            frame.break_jumps = breaks
+            frame.continue_jumps = continues
 
-        # 6) else block (if present)
-        if node.else_block is not None:
-            # else_block may be a Block (normal else) or a nested If (elif chain)
-            if isinstance(node.else_block, Block):
-                self.compile_block(node.else_block)
+    def compile_if(self, node):
+        # if / elif* / else is compiled as one flat chain: each failed condition jumps to
+        # the next test, and every taken arm jumps to a single shared end.
+        bc, emit = self.bc, self.emit
+        end_jumps = []
+        dead = []  # arms skipped by a constant-false condition, compiled and discarded last
+        while True:
+            cond = node.condition
+            rest = node.else_block
+            if type(cond) is Literal and type(cond.value) is bool:
+                # Constant condition (possibly after folding): emit only the branch that runs.
+                if cond.value:
+                    self.compile_block(node.then_block)
+                    if rest is not None:
+                        self._compile_discarded(lambda: self._compile_branch(rest))
+                    break
+                dead.append(node.then_block)
             else:
-                self.compile_stmt(node.else_block)
+                self.compile_expr(cond)
+                jmp_false_i = emit("JUMP_IF_FALSE", None, node)
+                self.compile_block(node.then_block)
+                if rest is not None:
+                    end_jumps.append(emit("JUMP", None, node))
+                bc.patch(jmp_false_i, len(bc.opcodes))
+
+            if type(rest) is If:
+                node = rest
+                continue
+            if rest is not None:
+                self.compile_block(rest)
+            break
 
-        # 7) patch end jump to "end"
-        end_pos = len(self.bc.instructions)
-        self.bc.patch(jmp_end_i, end_pos)
+        for block in dead:
+            self._compile_discarded(lambda block=block: self.compile_block(block))
+        bc.patch_many(end_jumps, len(bc.opcodes))
+
+    def _compile_branch(self, branch):
+        # else_block may be a Block (normal else) or a nested If (elif chain)
+        if branch is None:
+            return
+        if isinstance(branch, Block):
+            self.compile_block(branch)
+        else:
+            self.compile_stmt(branch)
 
     # -------- expressions --------
     def compile_expr(self, node):
-        if isinstance(node, Literal):
-            if isinstance(node.value, str) and ("{" in node.value or "}" in node.value):
-                k = self.bc.add_const(node.value)
-                self.emit("LOAD_CONST", k, node)
-                self.emit("FORMAT_STRING", node=node)
-                return
+        handler = self._expr_handlers.get(type(node))
+        if handler is None:
+            raise Exception(f"Unknown expression node: {node.__class__.__name__}")
+        handler(node)
 
+    def compile_literal(self, node):
+        if node.is_format:
             k = self.bc.add_const(node.value)
             self.emit("LOAD_CONST", k, node)
+            self.emit("FORMAT_STRING", None, node)
             return
 
-        if isinstance(node, ListLiteral):
-            for item in node.items:
-                self.compile_expr(item)
-            self.emit("BUILD_LIST", len(node.items), node)
-            return
-
-        if isinstance(node, DictLiteral):
-            for key_node, value_node in node.pairs:
-                self.compile_expr(key_node)
-                self.compile_expr(value_node)
-            self.emit("BUILD_DICT", len(node.pairs), node)
-            return
+        k = self.bc.add_const(node.value)
+        self.emit("LOAD_CONST", k, node)
 
-        if isinstance(node, Var):
-            self.emit("LOAD_NAME", node.name, node)
-            return
-
-        if isinstance(node, ListAccess):
-            if node.index_expr is None:
-                self.emit("LOAD_NAME", node.name, node)
-            else:
-                self.emit("LOAD_NAME", node.name, node)
-                self.compile_expr(node.index_expr)
-                self.emit("LIST_GET", node=node)
-            return
-
-        if isinstance(node, IndexAccess):
-            if node.key_expr is None:
-                self.emit("LOAD_NAME", node.name, node)
-            else:
-                self.emit("LOAD_NAME", node.name, node)
-                self.compile_expr(node.key_expr)
-                self.emit("INDEX_GET", node=node)
+    def compile_list_literal(self, node):
+        items = node.items
+        if len(items) > 1 and all(_is_plain_literal(i) for i in items):
+            k = self.bc.add_const(tuple(i.value for i in items))
+            self.emit("LOAD_CONST", k, node)
+            self.emit("BUILD_LIST_FROM_CONST", None, node)
             return
+        for item in items:
+            self.compile_expr(item)
+        self.emit("BUILD_LIST", len(items), node)
 
-        if isinstance(node, Binary):
-            if node.op == "and":
-                # Short-circuit AND:
-                #   eval left
-                #   DUP
-                #   JUMP_IF_FALSE end   (pops dup; leaves original left)
-                #   POP                 (discard original left; we know it's True)
-                #   eval right          (result)
-                # end:
-                self.compile_expr(node.left)
-                self.emit("DUP", node=node)
-                jmp_end_i = self.emit("JUMP_IF_FALSE", None, node)
-                self.emit("POP", node=node)
-                self.compile_expr(node.right)
-                end_pos = len(self.bc.instructions)
-                self.bc.patch(jmp_end_i, end_pos)
-                return
-
-            if node.op == "or":
-                # Short-circuit OR:
-                #   eval left
-                #   DUP
-                #   JUMP_IF_FALSE eval_right (pops dup; leaves original left)
-                #   JUMP end                (keep original left)
-                # eval_right:
-                #   POP                     (discard original left; we know it's False)
-                #   eval right
-                # end:
-                self.compile_expr(node.left)
-                self.emit("DUP", node=node)
-                jmp_eval_right_i = self.emit("JUMP_IF_FALSE", None, node)
-                jmp_end_i = self.emit("JUMP", None, node)
-
-                eval_right_pos = len(self.bc.instructions)
-                self.bc.patch(jmp_eval_right_i, eval_right_pos)
-                self.emit("POP", node=node)
-                self.compile_expr(node.right)
-
-                end_pos = len(self.bc.instructions)
-                self.bc.patch(jmp_end_i, end_pos)
-                return
-
+    def compile_dict_literal(self, node):
+        pairs = node.pairs
+        if (
+            len(pairs) > 1
+            and all(_is_plain_literal(k) and isinstance(k.value, str) and _is_plain_literal(v) for k, v in pairs)
+        ):
+            # BUILD_DICT pops pairs last-to-first; store them in that order.
+            k = self.bc.add_const(tuple((kn.value, vn.value) for kn, vn in reversed(pairs)))
+            self.emit("LOAD_CONST", k, node)
+            self.emit("BUILD_DICT_FROM_CONST", None, node)
+            return
+        for key_node, value_node in pairs:
+            self.compile_expr(key_node)
+            self.compile_expr(value_node)
+        self.emit("BUILD_DICT", len(pairs), node)
+
+    def compile_var(self, node):
+        self._emit_load(node.name, node)
+
+    def compile_list_access(self, node):
+        if node.index_expr is None:
+            self._emit_load(node.name, node)
+        elif self._can_fuse(node.name, node.index_expr):
+            self.compile_expr(node.index_expr)
+            self.emit("LOAD_LIST_GET", node.name, node)
+        else:
+            self._emit_load(node.name, node)
+            self.compile_expr(node.index_expr)
+            self.emit("LIST_GET", None, node)
+
+    def compile_index_access(self, node):
+        if node.key_expr is None:
+            self._emit_load(node.name, node)
+        elif self._can_fuse(node.name, node.key_expr):
+            self.compile_expr(node.key_expr)
+            self.emit("LOAD_INDEX_GET", node.name, node)
+        else:
+            self._emit_load(node.name, node)
+            self.compile_expr(node.key_expr)
+            self.emit("INDEX_GET", None, node)
+
+    def compile_binary(self, node):
+        bc, emit = self.bc, self.emit
+        if node.op == "and" or node.op == "or":
+            # Short-circuit: the left value (a bool) is the result if it decides the outcome.
+            #   eval left
+            #   JUMP_IF_FALSE_OR_POP end   (or: JUMP_IF_TRUE_OR_POP; otherwise left is popped)
+            #   eval right                 (result)
+            # end:
             self.compile_expr(node.left)
+            jump = "JUMP_IF_FALSE_OR_POP" if node.op == "and" else "JUMP_IF_TRUE_OR_POP"
+            jmp_end_i = emit(jump, None, node)
             self.compile_expr(node.right)
-            self.emit(self.binary_op_to_opcode(node.op), node=node)
+            bc.patch(jmp_end_i, len(bc.opcodes))
             return
 
-        if isinstance(node, CompareChain):
-            # Evaluate each term once, short-circuit on first false.
-            tmp_left = self._new_tmp("__cmp_left")
-            tmp_right = self._new_tmp("__cmp_right")
-
-            self.compile_expr(node.first)
-            self.emit("STORE_NAME", tmp_left, node)
-
-            end_jumps = []
-            for i, op in enumerate(node.ops):
-                right_expr = node.rest[i]
-                self.compile_expr(right_expr)
-                self.emit("STORE_NAME", tmp_right, node)
-
-                self.emit("LOAD_NAME", tmp_left, node)
-                self.emit("LOAD_NAME", tmp_right, node)
-                self.emit(self.binary_op_to_opcode(op), node=node)
-
-                if i != len(node.ops) - 1:
-                    self.emit("DUP", node=node)
-                    jmp_end_i = self.emit("JUMP_IF_FALSE", None, node)
-                    end_jumps.append(jmp_end_i)
-                    self.emit("POP", node=node)
-
-                    # advance tmp_left = tmp_right for next comparison
-                    self.emit("LOAD_NAME", tmp_right, node)
-                    self.emit("STORE_NAME", tmp_left, node)
-
-            end_pos = len(self.bc.instructions)
-            for jmp_i in end_jumps:
-                self.bc.patch(jmp_i, end_pos)
-            return
+        self.compile_expr(node.left)
+        self.compile_expr(node.right)
+        emit(self.binary_op_to_opcode(node.op), None, node)
 
-        if isinstance(node, Unary):
-            if node.op != "not":
-                raise Exception(f"Unknown unary operator: {node.op}")
-            self.compile_expr(node.expr)
-            self.emit("NOT", node=node)
-            return
+    def compile_compare_chain(self, node):
+        bc, emit = self.bc, self.emit
+        # Evaluate each term once, short-circuit on first false.
+        tmp_left = self._new_tmp("__cmp_left")
+        tmp_right = self._new_tmp("__cmp_right")
 
-        if isinstance(node, Call):
-            self.compile_call(node)
-            return
+        self.compile_expr(node.first)
+        self._emit_store(tmp_left, node)
 
-        raise Exception(f"Unknown expression node: {node.__class__.__name__}")
+        end_jumps = []
+        for i, op in enumerate(node.ops):
+            right_expr = node.rest[i]
+            self.compile_expr(right_expr)
+            self._emit_store(tmp_right, node)
+
+            self._emit_load(tmp_left, node)
+            self._emit_load(tmp_right, node)
+            emit(self.binary_op_to_opcode(op), None, node)
+
+            if i != len(node.ops) - 1:
+                emit("DUP", None, node)
+                jmp_end_i = emit("JUMP_IF_FALSE", None, node)
+                end_jumps.append(jmp_end_i)
+                emit("POP", None, node)
+
+                # advance tmp_left = tmp_right for next comparison
+                self._emit_load(tmp_right, node)
+                self._emit_store(tmp_left, node)
+
+        end_pos = len(bc.opcodes)
+        bc.patch_many(end_jumps, end_pos)
+
+    def compile_unary(self, node):
+        if node.op != "not":
+            raise Exception(f"Unknown unary operator: {node.op}")
+        self.compile_expr(node.expr)
+        self.emit("NOT", None, node)
 
-    def compile_call(self, node):
+    def compile_call(self, node, void=False):
+        emit = self.emit
         # compile args first (each pushes a value)
-        has_named = any(isinstance(a, NamedArg) for a in node.args)
+        has_named = any(type(a) is NamedArg for a in node.args)
         arg_names = []
         if has_named:
             # enforce positional-first, then named
             for a in node.args:
-                if isinstance(a, NamedArg):
+                if type(a) is NamedArg:
                     self.compile_expr(a.value_expr)
                     arg_names.append(a.name)
                 else:
@@ -552,134 +820,57 @@ class Compiler:
             for arg in node.args:
                 self.compile_expr(arg)
 
-        # only builtin for now: write(x)
-        if node.name == "write":
-            if has_named:
-                raise Exception("write() does not support named arguments")
-            self.emit("CALL_BUILTIN", ("write", len(node.args)), node)
-            return
-
-        # builtin: enter(prompt)
-        if node.name == "enter":
-            if has_named:
-                raise Exception("enter() does not support named arguments")
-            if len(node.args) != 1:
-                raise Exception("enter() must have exactly 1 argument")
-            self.emit("CALL_BUILTIN", ("enter", 1), node)
-            return
-
-        # builtin: args() -> list of CLI/script arguments
-        if node.name == "args":
-            if has_named:
-                raise Exception("args() does not support named arguments")
-            if len(node.args) != 0:
-                raise Exception("args() must have exactly 0 arguments")
-            self.emit("CALL_BUILTIN", ("args", 0), node)
-            return
-
-        # builtins: conversions
-        if node.name in (
-            "conv_int", "conv_float", "conv_bool",
-            "try_conv_int", "try_conv_float", "try_conv_bool",
-        ):
+        if node.name in _BUILTIN_SPEC:
+            arity = _BUILTIN_SPEC[node.name]
             if has_named:
                 raise Exception(f"{node.name}() does not support named arguments")
-            if len(node.args) != 1:
-                raise Exception(f"{node.name}() must have exactly 1 argument")
-            self.emit("CALL_BUILTIN", (node.name, 1), node)
-            return
-
-        # builtins: lists/strings
-        if node.name in ("amount", "del", "upper", "lower"):
-            if has_named:
-                raise Exception(f"{node.name}() does not support named arguments")
-            if len(node.args) != 1:
-                raise Exception(f"{node.name}() must have exactly 1 argument")
-            self.emit("CALL_BUILTIN", (node.name, 1), node)
-            return
-
-        if node.name in ("split", "join"):
-            if has_named:
-                raise Exception(f"{node.name}() does not support named arguments")
-            if len(node.args) != 2:
-                raise Exception(f"{node.name}() must have exactly 2 arguments")
-            self.emit("CALL_BUILTIN", (node.name, 2), node)
-            return
-
-        if node.name in ("replace",):
-            if has_named:
-                raise Exception(f"{node.name}() does not support named arguments")
-            if len(node.args) != 3:
-                raise Exception(f"{node.name}() must have exactly 3 arguments")
-            self.emit("CALL_BUILTIN", (node.name, 3), node)
-            return
-
-        if node.name in ("insert",):
-            if has_named:
-                raise Exception(f"{node.name}() does not support named arguments")
-            if len(node.args) != 3:
-                raise Exception(f"{node.name}() must have exactly 3 arguments")
-            self.emit("CALL_BUILTIN", (node.name, 3), node)
-            return
-
-        # builtins: file I/O
-        if node.name in ("save", "append", "change"):
-            if has_named:
-                raise Exception(f"{node.name}() does not support named arguments")
-            if len(node.args) != 2:
-                raise Exception(f"{node.name}() must have exactly 2 arguments")
-            self.emit("CALL_BUILTIN", (node.name, 2), node)
-            return
-
-        if node.name in ("load", "read"):
-            if has_named:
-                raise Exception(f"{node.name}() does not support named arguments")
-            if len(node.args) != 1:
-                raise Exception(f"{node.name}() must have exactly 1 argument")
-            self.emit("CALL_BUILTIN", (node.name, 1), node)
+            if arity is not None and len(node.args) != arity:
+                plural = "" if arity == 1 else "s"
+                raise Exception(f"{node.name}() must have exactly {arity} argument{plural}")
+            operand = _BUILTIN_CALL_ARGS.get(node.name) or (node.name, len(node.args))
+            emit("CALL_BUILTIN", operand, node)
             return
 
         # user-defined function (existence checked at runtime by VM)
+        op = "CALL_VOID" if void else "CALL_FUNC"
         if has_named:
-            self.emit("CALL_FUNC", (node.name, len(node.args), arg_names), node)
+            emit(op, (node.name, len(node.args), arg_names), node)
         else:
-            self.emit("CALL_FUNC", (node.name, len(node.args)), node)
+            emit(op, (node.name, len(node.args)), node)
 
-    def compile_stop(self):
-        if not self.loop_stack:
+    def _push_loop(self, frame):
+        self.loop_stack.append(frame)
+        self._current_loop = frame
+
+    def _pop_loop(self):
+        self.loop_stack.pop()
+        self._current_loop = self.loop_stack[-1] if self.loop_stack else None
+
+    def compile_stop(self, node=None):
+        frame = self._current_loop
+        if frame is None:
             raise Exception("stop used outside of a loop")
 
-        frame = self.loop_stack[-1]
         jmp_i = self.emit("JUMP", None)
-        frame["break_jumps"].append(jmp_i)
+        frame.break_jumps.append(jmp_i)
 
-    def compile_continue(self):
-        if not self.loop_stack:
+    def compile_continue(self, node=None):
+        frame = self._current_loop
+        if frame is None:
             raise Exception("continue used outside of a loop")
 
-        frame = self.loop_stack[-1]
         jmp_i = self.emit("JUMP", None)
-        frame["continue_jumps"].append(jmp_i)
+        frame.continue_jumps.append(jmp_i)
 
     def _new_tmp(self, prefix):
-        name = f"{prefix}_{self._tmp_id}"
+        # interned like the AST names, so LOAD/STORE_NAME keys compare by identity
+        name = intern(f"{prefix}_{self._tmp_id}")
         self._tmp_id += 1
         return name
 
     def binary_op_to_opcode(self, op):
-        mapping = {
-            "+": "ADD",
-            "-": "SUB",
-            "*": "MUL",
-            "/": "DIV",
-            "==": "CMP_EQ",
-            "!=": "CMP_NE",
-            "<": "CMP_LT",
-            "<=": "CMP_LE",
-            ">": "CMP_GT",
-            ">=": "CMP_GE",
-        }
-        if op not in mapping:
-            raise Exception(f"Unknown operator: {op}")
-        return mapping[op]
+        try:
+            return _BINOP_OPCODES[op]
+        except KeyError:
+            raise Exception(f"Unknown operator: {op}") from None
     
\ No newline at end of file
@@ -1,44 +1,186 @@
+import re
+from bisect import bisect_right
+
+
+# One match per token: leading blanks/comment, then a common token. Whatever it doesn't
+# cover (triple-quoted strings, strings with escapes, non-ASCII identifiers/numbers, bad
+# input) falls back to the char-by-char readers below.
+_TOKEN_RE = re.compile(r"""
+    [ \t\r]*(?:\#[^\n]*(?![^\n]))?
+    (?:
+    (?P<newline>\n)
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<float>[0-9]+\.[0-9]*)(?![0-9.]|[^\x00-\x7f])
+  | (?P<int>[0-9]+)(?![0-9.]|[^\x00-\x7f])
+  | (?P<string>"(?!"")[^"\\]*"|'[^'\\]*')
+  | (?P<op>==|!=|<=|>=|=[sifbld]|[-+*/,:(){}\[\]<>])
+  | (?P<eof>\Z)
+    )
+""", re.VERBOSE)
+
+_NEWLINE_RE = re.compile(r"\n")
+_BLANKS_RE = re.compile(r"[ \t\r]*")
+_IDENT_RE = re.compile(r"\w*")
+_NUMBER_PREFIX_RE = re.compile(r"[0-9]*(?:\.[0-9]*)?")
+
+# Char sets for the char-by-char readers (set lookups, not substring searches).
+_BLANKS = frozenset(" \t\r")
+_QUOTES = frozenset("\"'")
+
+# one escape after a backslash: \uXXXX (group 1), else the alias or single char (group 2)
+_ESC_RE = re.compile(r"\\(?:u([0-9a-fA-F]{4})|(line|tab|.))", re.DOTALL)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "line": "\n", "tab": "\t"}
+
+# operator / typed marker -> (token type, value); operators carry their source text and
+# the typed markers their short type letter, so the parser never maps them back
+_OP_TOKENS = {
+    "==": ("EQEQ", "=="), "!=": ("NOTEQ", "!="), "<=": ("LTE", "<="), ">=": ("GTE", ">="),
+    "<": ("LT", "<"), ">": ("GT", ">"),
+    "=s": ("TYPE_STRING", "s"), "=i": ("TYPE_INT", "i"), "=f": ("TYPE_FLOAT", "f"),
+    "=b": ("TYPE_BOOL", "b"), "=l": ("TYPE_LIST", "l"), "=d": ("TYPE_DICT", "d"),
+    "+": ("PLUS", "+"), "-": ("MINUS", "-"), "*": ("STAR", "*"), "/": ("SLASH", "/"),
+    ",": ("COMMA", None), ":": ("COLON", None),
+    "(": ("LPAREN", None), ")": ("RPAREN", None), "{": ("LBRACE", None), "}": ("RBRACE", None),
+    "[": ("LBRACKET", None), "]": ("RBRACKET", None),
+}
+
+# keyword -> (token type, value); break is an alias of stop
+_KEYWORDS = {
+    "while": ("WHILE", None),
+    "if": ("IF", None),
+    "elif": ("ELIF", None),
+    "else": ("ELSE", None),
+    "match": ("MATCH", None),
+    "and": ("AND", "and"),
+    "or": ("OR", "or"),
+    "not": ("NOT", None),
+    "func": ("FUNC", None),
+    "return": ("RETURN", None),
+    "import": ("IMPORT", None),
+    "export": ("EXPORT", None),
+    "trace": ("TRACE", None),
+    "write": ("WRITE", None),
+    "for": ("FOR", None),
+    "in": ("IN", None),
+    "true": ("BOOL", True),
+    "false": ("BOOL", False),
+    "stop": ("STOP", None),
+    "break": ("STOP", None),
+    "continue": ("CONTINUE", None),
+}
+
+
 class Token:
-    def __init__(self, type, value=None, line=1, column=1):
+    __slots__ = ("type", "value", "line", "column")
+
+    def __init__(self, type: str, value=None, line: int = 1, column: int = 1):
         self.type = type
         self.value = value
         self.line = line
         self.column = column
 
     def __repr__(self):
-        if self.value is not None:
-            return f"{self.type}({self.value})"
-        return f"{self.type}"
+        if self.value is None:
+            return self.type
+        return f"{self.type}({self.value})"
 
 
 class Lexer:
-    def __init__(self, text):
+    def __init__(self, text: str):
         self.text = text
         self.pos = 0
         self.current_char = text[0] if text else None
-        self.line = 1
-        self.column = 1
-
-    def advance(self):
-        # track line/column based on current_char before moving
-        if self.current_char == "\n":
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
+        self._line_starts = None  # pos of each line's first char, built by _line_of() on demand
+
+        # The whole text is lexed up front; the parser walks self.tokens by index.
+        # error: the lexing error that ended the list early (None if it ends with EOF)
+        self.tokens, self.error = self._tokenize()
+
+    def _tokenize(self):
+        # Common tokens come from one _TOKEN_RE match each, with the scan state in locals.
+        # Tokens carry their own line/column (the parser reports errors and sets node.line
+        # from them), so each is a fresh object; positional args keep the call cheap.
+        # A lexing error is held back until the parser reaches that point, so an
+        # earlier syntax error is still the one reported.
+        text = self.text
+        match = _TOKEN_RE.match
+        tokens = []
+        append = tokens.append
+        pos, line, line_start = 0, 1, 0
+        try:
+            while True:
+                m = match(text, pos)
+                if m is None:
+                    self.pos = pos
+                    tok = self._next_token_slow()
+                    append(tok)
+                    if tok.type == "EOF":
+                        return tokens, None
+                    pos = self.pos
+                    line, line_start = self._line_of(pos)
+                    continue
+
+                kind = m.lastgroup
+                lexeme = m.group(kind)
+                start = m.start(kind)
+                pos = m.end()
+                col = start - line_start + 1
+                if kind == "op":
+                    op = _OP_TOKENS[lexeme]
+                    append(Token(op[0], op[1], line, col))
+                elif kind == "ident":
+                    kw = _KEYWORDS.get(lexeme)
+                    if kw is None:
+                        append(Token("IDENT", lexeme, line, col))
+                    else:
+                        append(Token(kw[0], kw[1], line, col))
+                elif kind == "newline":
+                    append(Token("NEWLINE", None, line, col))
+                    line += 1
+                    line_start = pos
+                elif kind == "int":
+                    append(Token("NUMBER", int(lexeme), line, col))
+                elif kind == "float":
+                    append(Token("NUMBER", float(lexeme), line, col))
+                elif kind == "eof":
+                    append(Token("EOF", None, line, col))
+                    return tokens, None
+                else:  # string
+                    append(Token("STRING", lexeme[1:-1], line, col))
+                    nl = lexeme.count("\n")
+                    if nl:
+                        line += nl
+                        line_start = start + lexeme.rindex("\n") + 1
+        except Exception as e:
+            return tokens, e
+
+    def _line_of(self, pos: int) -> tuple[int, int]:
+        # (line number, pos of that line's first char) for pos
+        starts = self._line_starts
+        if starts is None:
+            starts = self._line_starts = [0] + [m.end() for m in _NEWLINE_RE.finditer(self.text)]
+        i = bisect_right(starts, pos) - 1
+        return i + 1, starts[i]
+
+    def _position(self, pos: int) -> tuple[int, int]:
+        # (line, column) of pos; the char-by-char readers only look this up at token starts
+        line, line_start = self._line_of(pos)
+        return line, pos - line_start + 1
+
+    def advance(self) -> None:
         self.pos += 1
         if self.pos >= len(self.text):
             self.current_char = None
         else:
             self.current_char = self.text[self.pos]
 
-    def peek(self):
+    def peek(self) -> str | None:
         nxt = self.pos + 1
         if nxt >= len(self.text):
             return None
         return self.text[nxt]
 
-    def peek_n(self, n):
+    def peek_n(self, n: int) -> str | None:
         idx = self.pos + n
         if idx >= len(self.text):
             return None
@@ -46,166 +188,97 @@ class Lexer:
 
     # IMPORTANT: skip spaces/tabs only (NOT newlines)
     def skip_whitespace(self):
-        while self.current_char and self.current_char in " \t\r":
-            self.advance()
+        self._jump(_BLANKS_RE.match(self.text, self.pos).end())
 
     def skip_comment(self):
-        while self.current_char and self.current_char != "\n":
-            self.advance()
-
-    def read_identifier(self):
-        start_line, start_col = self.line, self.column
-        result = ""
-        while self.current_char and (self.current_char.isalnum() or self.current_char == "_"):
-            result += self.current_char
-            self.advance()
-        if result == "while":
-            return Token("WHILE", line=start_line, column=start_col)
-        if result == "if":
-            return Token("IF", line=start_line, column=start_col)
-        if result == "elif":
-            return Token("ELIF", line=start_line, column=start_col)
-        if result == "else":
-            return Token("ELSE", line=start_line, column=start_col)
-        if result == "match":
-            return Token("MATCH", line=start_line, column=start_col)
-        if result == "and":
-            return Token("AND", line=start_line, column=start_col)
-        if result == "or":
-            return Token("OR", line=start_line, column=start_col)
-        if result == "not":
-            return Token("NOT", line=start_line, column=start_col)
-        if result == "func":
-            return Token("FUNC", line=start_line, column=start_col)
-        if result == "return":
-            return Token("RETURN", line=start_line, column=start_col)
-        if result == "import":
-            return Token("IMPORT", line=start_line, column=start_col)
-        if result == "export":
-            return Token("EXPORT", line=start_line, column=start_col)
-        if result == "trace":
-            return Token("TRACE", line=start_line, column=start_col)
-        if result == "write":
-            return Token("WRITE", line=start_line, column=start_col)
-        if result == "for":
-            return Token("FOR", line=start_line, column=start_col)
-        if result == "in":
-            return Token("IN", line=start_line, column=start_col)
-        if result == "true":
-            return Token("BOOL", True, line=start_line, column=start_col)
-        if result == "false":
-            return Token("BOOL", False, line=start_line, column=start_col)
-        if result == "stop":
-            return Token("STOP", line=start_line, column=start_col)
-        if result == "break":
-            return Token("STOP", line=start_line, column=start_col)
-        if result == "continue":
-            return Token("CONTINUE", line=start_line, column=start_col)
-
-        return Token("IDENT", result, line=start_line, column=start_col)
-
-    def read_number(self):
-        start_line, start_col = self.line, self.column
-        result = ""
-        has_dot = False
-
-        while self.current_char and (self.current_char.isdigit() or self.current_char == "."):
-            if self.current_char == ".":
+        nl = self.text.find("\n", self.pos)
+        self._jump(len(self.text) if nl == -1 else nl)
+
+    def _jump(self, end: int) -> None:
+        # advance() to end in one step
+        self.pos = end
+        self.current_char = self.text[end] if end < len(self.text) else None
+
+    def read_identifier(self) -> Token:
+        start_line, start_col = self._position(self.pos)
+        # \w is exactly str.isalnum() plus "_"
+        m = _IDENT_RE.match(self.text, self.pos)
+        self._jump(m.end())
+        return self._identifier_token(m.group(), start_line, start_col)
+
+    @staticmethod
+    def _identifier_token(result: str, start_line: int, start_col: int) -> Token:
+        kw = _KEYWORDS.get(result)
+        if kw is not None:
+            return Token(kw[0], kw[1], start_line, start_col)
+        return Token("IDENT", result, start_line, start_col)
+
+    def read_number(self) -> Token:
+        start_line, start_col = self._position(self.pos)
+        text, start = self.text, self.pos
+        # ASCII prefix in one match; the loop then carries on with any non-ASCII
+        # str.isdigit() chars (no regex class matches those exactly).
+        m = _NUMBER_PREFIX_RE.match(text, start)
+        has_dot = "." in m.group()
+        end, n = m.end(), len(text)
+        while end < n and (text[end].isdigit() or text[end] == "."):
+            if text[end] == ".":
                 if has_dot:
                     break
                 has_dot = True
-            result += self.current_char
-            self.advance()
+            end += 1
 
+        result = text[start:end]
+        self._jump(end)
         if has_dot:
             return Token("NUMBER", float(result), line=start_line, column=start_col)
         return Token("NUMBER", int(result), line=start_line, column=start_col)
 
-    def read_string(self):
-        start_line, start_col = self.line, self.column
+    def read_string(self) -> Token:
+        start_line, start_col = self._position(self.pos)
         quote = self.current_char  # ' or "
         assert quote is not None
         self.advance()  # skip opening quote
-        result = ""
+        parts = []
 
         while self.current_char and self.current_char != quote:
             if self.current_char == "\\":
-                # escape support: \n, \t, \\, \" and \', plus aliases \line and \tab
-                self.advance()  # consume backslash
-                if self.current_char is None:
+                if not self._consume_escape(parts):
                     break
-
-                # \uXXXX -> unicode codepoint
-                if self.current_char == "u":
-                    h1, h2, h3, h4 = self.peek(), self.peek_n(2), self.peek_n(3), self.peek_n(4)
-                    hex_digits = [h1, h2, h3, h4]
-                    if all(d is not None and d in "0123456789abcdefABCDEF" for d in hex_digits):
-                        code = "".join(hex_digits)
-                        result += chr(int(code, 16))
-                        # consume u + 4 hex digits
-                        for _ in range(5):
-                            self.advance()
-                        continue
-
-                # \line -> newline
-                if (
-                    self.current_char == "l"
-                    and self.peek() == "i"
-                    and self.peek_n(2) == "n"
-                    and self.peek_n(3) == "e"
-                ):
-                    result += "\n"
-                    # consume l i n e
-                    for _ in range(4):
-                        self.advance()
-                    continue
-
-                # 	ab -> tab
-                if (
-                    self.current_char == "t"
-                    and self.peek() == "a"
-                    and self.peek_n(2) == "b"
-                ):
-                    result += "\t"
-                    # consume t a b
-                    for _ in range(3):
-                        self.advance()
-                    continue
-
-                esc = self.current_char
-                if esc == "n":
-                    result += "\n"
-                elif esc == "t":
-                    result += "\t"
-                elif esc == "r":
-                    result += "\r"
-                elif esc == "0":
-                    result += "\0"
-                elif esc == "\\":
-                    result += "\\"
-                elif esc == quote:
-                    result += quote
-                elif esc == "\"" and quote == "'":
-                    result += "\""
-                elif esc == "'" and quote == "\"":
-                    result += "'"
-                else:
-                    # unknown escape: keep literally
-                    result += esc
-                self.advance()
                 continue
 
-            result += self.current_char
-            self.advance()
+            # plain text: copy everything up to the next quote or backslash in one slice
+            text = self.text
+            end = text.find(quote, self.pos)
+            if end == -1:
+                end = len(text)
+            bs = text.find("\\", self.pos, end)
+            if bs != -1:
+                end = bs
+            parts.append(text[self.pos:end])
+            self._jump(end)
 
         if self.current_char != quote:
             raise Exception(f"Unclosed string (started at line {start_line}, col {start_col})")
 
         self.advance()  # skip closing quote
-        return Token("STRING", result, line=start_line, column=start_col)
-
-    def read_triple_string(self):
-        start_line, start_col = self.line, self.column
+        return Token("STRING", "".join(parts), line=start_line, column=start_col)
+
+    def _consume_escape(self, parts: list) -> bool:
+        # escape support: \n, \t, \r, \0, \uXXXX, plus aliases \line and \tab;
+        # any other escaped char (\\, \", \') is kept literally.
+        # False for a backslash at end of input (the caller reports the unclosed string).
+        m = _ESC_RE.match(self.text, self.pos)
+        if m is None:
+            self.advance()
+            return False
+        code = m.group(1)
+        parts.append(chr(int(code, 16)) if code else _ESCAPES.get(m.group(2), m.group(2)))
+        self._jump(m.end())
+        return True
+
+    def read_triple_string(self) -> Token:
+        start_line, start_col = self._position(self.pos)
         # Only supports triple double-quotes: """ ... """
         if not (self.current_char == '"' and self.peek() == '"' and self.peek_n(2) == '"'):
             raise Exception("Internal lexer error: expected triple-quoted string")
@@ -215,8 +288,15 @@ class Lexer:
         self.advance()
         self.advance()
 
-        result = ""
-        quote = '"'
+        # no backslash before the closing """: the body is one slice
+        text = self.text
+        close = text.find('"""', self.pos)
+        if close != -1 and text.find("\\", self.pos, close) == -1:
+            body = text[self.pos:close]
+            self._jump(close + 3)
+            return Token("STRING", body, line=start_line, column=start_col)
+
+        parts = []
 
         while self.current_char is not None:
             # closing """
@@ -224,84 +304,42 @@ class Lexer:
                 self.advance()
                 self.advance()
                 self.advance()
-                return Token("STRING", result, line=start_line, column=start_col)
+                return Token("STRING", "".join(parts), line=start_line, column=start_col)
 
             if self.current_char == "\\":
-                # escape support: \n, \t, \\, \" and \', plus aliases \line and \tab
-                self.advance()  # consume backslash
-                if self.current_char is None:
+                if not self._consume_escape(parts):
                     break
-
-                # \uXXXX -> unicode codepoint
-                if self.current_char == "u":
-                    h1, h2, h3, h4 = self.peek(), self.peek_n(2), self.peek_n(3), self.peek_n(4)
-                    hex_digits = [h1, h2, h3, h4]
-                    if all(d is not None and d in "0123456789abcdefABCDEF" for d in hex_digits):
-                        code = "".join(hex_digits)
-                        result += chr(int(code, 16))
-                        for _ in range(5):
-                            self.advance()
-                        continue
-
-                # \line -> newline
-                if (
-                    self.current_char == "l"
-                    and self.peek() == "i"
-                    and self.peek_n(2) == "n"
-                    and self.peek_n(3) == "e"
-                ):
-                    result += "\n"
-                    for _ in range(4):
-                        self.advance()
-                    continue
-
-                # 	ab -> tab
-                if (
-                    self.current_char == "t"
-                    and self.peek() == "a"
-                    and self.peek_n(2) == "b"
-                ):
-                    result += "\t"
-                    for _ in range(3):
-                        self.advance()
-                    continue
-
-                esc = self.current_char
-                if esc == "n":
-                    result += "\n"
-                elif esc == "t":
-                    result += "\t"
-                elif esc == "r":
-                    result += "\r"
-                elif esc == "0":
-                    result += "\0"
-                elif esc == "\\":
-                    result += "\\"
-                elif esc == quote:
-                    result += quote
-                elif esc == "'":
-                    result += "'"
-                else:
-                    result += esc
-                self.advance()
                 continue
 
-            result += self.current_char
-            self.advance()
+            # plain text (this char can't end the string): copy up to the next quote or backslash
+            end = text.find('"', self.pos + 1)
+            if end == -1:
+                end = len(text)
+            bs = text.find("\\", self.pos + 1, end)
+            if bs != -1:
+                end = bs
+            parts.append(text[self.pos:end])
+            self._jump(end)
 
         raise Exception(f"Unclosed triple-quoted string (started at line {start_line}, col {start_col})")
 
-    def get_next_token(self):
+    def _next_token_slow(self) -> Token:
+        # Char-by-char path: lex one token starting at pos.
+        pos = self.pos
+        self.current_char = self.text[pos] if pos < len(self.text) else None
+        return self._read_token()
+
+    def _read_token(self) -> Token:
         while self.current_char:
 
             # NEWLINE is a real token (parser needs it)
             if self.current_char == "\n":
-                start_line, start_col = self.line, self.column
+                start_line, start_col = self._position(self.pos)
                 self.advance()
                 return Token("NEWLINE", line=start_line, column=start_col)
 
             # spaces/tabs
-            if self.current_char in " \t\r":
+            if self.current_char in _BLANKS:
                 self.skip_whitespace()
                 continue
 
@@ -321,122 +359,25 @@ class Lexer:
             # strings
             if self.current_char == '"' and self.peek() == '"' and self.peek_n(2) == '"':
                 return self.read_triple_string()
-            if self.current_char in "\"'":
+            if self.current_char in _QUOTES:
                 return self.read_string()
 
-            # typed assignment markers: =s =i =f =b
-            if self.current_char == "=":
-                start_line, start_col = self.line, self.column
-                # check == first
-                if self.peek() == "=":
-                    self.advance()
-                    self.advance()
-                    return Token("EQEQ", line=start_line, column=start_col)
-
-                # otherwise typed assignment like =s
-                self.advance()  # consume '='
-                if self.current_char == "s":
-                    self.advance()
-                    return Token("TYPE_STRING", line=start_line, column=start_col)
-                if self.current_char == "i":
-                    self.advance()
-                    return Token("TYPE_INT", line=start_line, column=start_col)
-                if self.current_char == "f":
-                    self.advance()
-                    return Token("TYPE_FLOAT", line=start_line, column=start_col)
-                if self.current_char == "b":
-                    self.advance()
-                    return Token("TYPE_BOOL", line=start_line, column=start_col)
-                if self.current_char == "l":
-                    self.advance()
-                    return Token("TYPE_LIST", line=start_line, column=start_col)
-                if self.current_char == "d":
-                    self.advance()
-                    return Token("TYPE_DICT", line=start_line, column=start_col)
-
-                raise Exception(f"Expected type after '=' (use =s, =i, =f, =b, =l, =d) at line {start_line}, col {start_col}")
-
-            # !=
-            if self.current_char == "!" and self.peek() == "=":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                self.advance()
-                return Token("NOTEQ", line=start_line, column=start_col)
-
-            # <=, <
-            if self.current_char == "<":
-                start_line, start_col = self.line, self.column
-                if self.peek() == "=":
-                    self.advance()
-                    self.advance()
-                    return Token("LTE", line=start_line, column=start_col)
-                self.advance()
-                return Token("LT", line=start_line, column=start_col)
-
-            # >=, >
-            if self.current_char == ">":
-                start_line, start_col = self.line, self.column
-                if self.peek() == "=":
-                    self.advance()
-                    self.advance()
-                    return Token("GTE", line=start_line, column=start_col)
-                self.advance()
-                return Token("GT", line=start_line, column=start_col)
-
-            # math
-            if self.current_char == "+":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("PLUS", line=start_line, column=start_col)
-            if self.current_char == "-":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("MINUS", line=start_line, column=start_col)
-            if self.current_char == "*":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("STAR", line=start_line, column=start_col)
-            if self.current_char == "/":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("SLASH", line=start_line, column=start_col)
-
-            # punctuation
-            if self.current_char == ",":
-                start_line, start_col = self.line, self.column
+            # operators and typed assignment markers (=s =i =f =b =l =d), two-char forms first
+            start_line, start_col = self._position(self.pos)
+            op = _OP_TOKENS.get(self.text[self.pos:self.pos + 2])
+            if op is not None:
                 self.advance()
-                return Token("COMMA", line=start_line, column=start_col)
-
-            if self.current_char == ":":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("COLON", line=start_line, column=start_col)
-
-            if self.current_char == "(":
-                start_line, start_col = self.line, self.column
                 self.advance()
-                return Token("LPAREN", line=start_line, column=start_col)
-            if self.current_char == ")":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("RPAREN", line=start_line, column=start_col)
-            if self.current_char == "{":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("LBRACE", line=start_line, column=start_col)
-            if self.current_char == "}":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("RBRACE", line=start_line, column=start_col)
-            if self.current_char == "[":
-                start_line, start_col = self.line, self.column
-                self.advance()
-                return Token("LBRACKET", line=start_line, column=start_col)
-            if self.current_char == "]":
-                start_line, start_col = self.line, self.column
+                return Token(op[0], op[1], start_line, start_col)
+            if self.current_char == "=":
+                raise Exception(f"Expected type after '=' (use =s, =i, =f, =b, =l, =d) at line {start_line}, col {start_col}")
+            op = _OP_TOKENS.get(self.current_char)
+            if op is not None:
                 self.advance()
-                return Token("RBRACKET", line=start_line, column=start_col)
+                return Token(op[0], op[1], start_line, start_col)
 
-            raise Exception(f"Unknown character: {self.current_char} at line {self.line}, col {self.column}")
+            line, col = self._position(self.pos)
+            raise Exception(f"Unknown character: {self.current_char} at line {line}, col {col}")
 
-        return Token("EOF", line=self.line, column=self.column)
+        line, col = self._position(self.pos)
+        return Token("EOF", line=line, column=col)
@@ -0,0 +1,90 @@
+from enum import IntEnum
+
+
+class Op(IntEnum):
+    # Bytecode opcodes. The compiler may emit either the name or the Op;
+    # BytecodeProgram stores the integer value.
+    LOAD_CONST = 0
+    LOAD_NAME = 1
+    STORE_NAME = 2
+    POP = 3
+    DUP = 4
+    FORMAT_STRING = 5
+
+    ADD = 6
+    SUB = 7
+    MUL = 8
+    DIV = 9
+
+    CMP_EQ = 10
+    CMP_NE = 11
+    CMP_LT = 12
+    CMP_LE = 13
+    CMP_GT = 14
+    CMP_GE = 15
+    NOT = 16
+
+    BUILD_LIST = 17
+    BUILD_DICT = 18
+    LIST_GET = 19
+    LIST_APPEND = 20
+    INDEX_GET = 21
+    INDEX_SET = 22
+    INDEX_REMOVE = 23
+
+    JUMP = 24
+    JUMP_IF_FALSE = 25
+
+    CALL_BUILTIN = 26
+    CALL_FUNC = 27
+    RETURN = 28
+
+    IMPORT = 29
+    SET_TRACE = 30
+    HALT = 31
+
+    # Superinstructions produced by the compiler's peephole pass.
+    MOVE_NAME = 32  # arg (src, dst): LOAD_NAME src; STORE_NAME dst
+
+    # Literal collections: pop a const tuple, push a fresh list/dict built from it.
+    BUILD_LIST_FROM_CONST = 33
+    BUILD_DICT_FROM_CONST = 34
+
+    # LOAD_NAME fused into the following list/dict op; arg is the target name, which is
+    # looked up after the index/value operands have been popped.
+    LOAD_LIST_GET = 35
+    LOAD_INDEX_GET = 36
+    LOAD_INDEX_SET = 37
+    LOAD_APPEND = 38
+    LOAD_INDEX_REMOVE = 39
+
+    # Function locals by slot (FuncMeta.local_names); an unset slot falls back to globals.
+    LOAD_FAST = 40
+    STORE_FAST = 41
+    MOVE_FAST = 42  # arg (src, dst): LOAD_FAST src; STORE_FAST dst (peephole)
+
+    # CALL_FUNC/CALL_VOID after their first execution: arg (FuncMeta, name, argc, arg_names, void).
+    # Written by the VM only, never by the compiler.
+    CALL_FUNC_CACHED = 43
+
+    # Add 1 to an int counter in place (for-loop index): by name / by local slot.
+    INC_NAME = 44
+    INC_FAST = 45
+
+    # match: pop a value, jump to table.get(value, default); arg (table, default)
+    SWITCH = 46
+
+    # and/or: TOS must be bool; jump keeping it if false/true, else pop and fall through
+    JUMP_IF_FALSE_OR_POP = 47
+    JUMP_IF_TRUE_OR_POP = 48
+
+    # CALL_BUILTIN after its first execution: arg (handler, name, argc). VM-written only.
+    CALL_BUILTIN_FAST = 49
+
+    # Statement-level user call: like CALL_FUNC, but the return value is dropped
+    # instead of pushed (replaces CALL_FUNC; POP).
+    CALL_VOID = 50
+
+
+# Opcodes whose arg is a single absolute instruction index (relocated when linking).
+JUMP_OPS = frozenset({Op.JUMP, Op.JUMP_IF_FALSE, Op.JUMP_IF_FALSE_OR_POP, Op.JUMP_IF_TRUE_OR_POP})
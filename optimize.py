@@ -0,0 +1,191 @@
+from ast_nodes import (
+    VarAssign, Literal, Binary, Unary, Call, NamedArg, Block, If, While, FuncDef, Return,
+    ListLiteral, ListAccess, SetListItem, AddListItem, RemoveListItem, For,
+    Match, DictLiteral, IndexAccess,
+    CompareChain,
+)
+
+# Folded strings longer than this stay as runtime MULs (don't bloat the const pool).
+MAX_FOLDED_STR = 4096
+
+_FOLD_OPS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def fold_constants(program):
+    # Rewrite literal-only expressions in place, computing them exactly as the VM would.
+    # Anything that would raise at runtime (1 / 0, 1 + "a", not 5) is left alone so the
+    # error still happens at runtime with its usual message.
+    for stmt in program.statements:
+        _fold_stmt(stmt)
+    return program
+
+
+def _is_const(node):
+    # Literals with braces are format strings, evaluated at runtime.
+    return isinstance(node, Literal) and not node.is_format
+
+
+def _literal(value, like):
+    node = Literal(value)
+    line = getattr(like, "line", None)
+    if line is not None:
+        node.line = line
+    return node
+
+
+def _fold_block(block):
+    if block is None:
+        return
+    for stmt in block.statements:
+        _fold_stmt(stmt)
+
+
+def _fold_stmt(node):
+    if isinstance(node, VarAssign):
+        node.value = _fold_expr(node.value)
+    elif isinstance(node, Return):
+        node.expr = _fold_expr(node.expr)
+    elif isinstance(node, Call):
+        _fold_call(node)
+    elif isinstance(node, If):
+        node.condition = _fold_expr(node.condition)
+        _fold_block(node.then_block)
+        if isinstance(node.else_block, If):
+            _fold_stmt(node.else_block)
+        else:
+            _fold_block(node.else_block)
+    elif isinstance(node, While):
+        node.condition = _fold_expr(node.condition)
+        _fold_block(node.body)
+        _fold_block(node.else_block)
+    elif isinstance(node, For):
+        node.iterable_expr = _fold_expr(node.iterable_expr)
+        _fold_block(node.body)
+        _fold_block(node.else_block)
+    elif isinstance(node, Match):
+        node.expr = _fold_expr(node.expr)
+        for _lit, block in node.cases:
+            _fold_block(block)
+        _fold_block(node.else_block)
+    elif isinstance(node, FuncDef):
+        # params are left as written: defaults must be literal in the source
+        _fold_block(node.body)
+    elif isinstance(node, SetListItem):
+        node.index_expr = _fold_expr(node.index_expr)
+        node.value_expr = _fold_expr(node.value_expr)
+    elif isinstance(node, AddListItem):
+        node.value_expr = _fold_expr(node.value_expr)
+    elif isinstance(node, RemoveListItem):
+        node.index_expr = _fold_expr(node.index_expr)
+    elif isinstance(node, Block):
+        _fold_block(node)
+
+
+def _fold_call(node):
+    for i, arg in enumerate(node.args):
+        if isinstance(arg, NamedArg):
+            arg.value_expr = _fold_expr(arg.value_expr)
+        else:
+            node.args[i] = _fold_expr(arg)
+
+
+def _fold_expr(node):
+    if node is None:
+        return None
+
+    if isinstance(node, Binary):
+        node.left = _fold_expr(node.left)
+        node.right = _fold_expr(node.right)
+        return _fold_binary(node)
+
+    if isinstance(node, Unary):
+        node.expr = _fold_expr(node.expr)
+        if node.op == "not" and _is_const(node.expr) and type(node.expr.value) is bool:
+            return _literal(not node.expr.value, node)
+        return node
+
+    if isinstance(node, CompareChain):
+        node.first = _fold_expr(node.first)
+        node.rest = [_fold_expr(e) for e in node.rest]
+        if _is_const(node.first) and all(_is_const(e) for e in node.rest):
+            # same short-circuit order as the emitted code
+            try:
+                left = node.first.value
+                result = True
+                for op, right_node in zip(node.ops, node.rest):
+                    result = _FOLD_OPS[op](left, right_node.value)
+                    if not result:
+                        break
+                    left = right_node.value
+            except Exception:
+                return node
+            return _literal(result, node)
+        return node
+
+    if isinstance(node, Call):
+        _fold_call(node)
+        return node
+
+    if isinstance(node, ListLiteral):
+        node.items = [_fold_expr(i) for i in node.items]
+        return node
+
+    if isinstance(node, DictLiteral):
+        node.pairs = [(k, _fold_expr(v)) for k, v in node.pairs]
+        return node
+
+    if isinstance(node, ListAccess):
+        node.index_expr = _fold_expr(node.index_expr)
+        return node
+
+    if isinstance(node, IndexAccess):
+        node.key_expr = _fold_expr(node.key_expr)
+        return node
+
+    return node
+
+
+def _fold_binary(node):
+    op = node.op
+    left = node.left
+
+    if op in ("and", "or"):
+        # Only the left side is checked (must be bool); the right side is the result as-is.
+        if not (_is_const(left) and type(left.value) is bool):
+            return node
+        if op == "and":
+            return node.right if left.value else left
+        return left if left.value else node.right
+
+    fn = _FOLD_OPS.get(op)
+    if fn is None or not (_is_const(left) and _is_const(node.right)):
+        return node
+
+    a, b = left.value, node.right.value
+    if op == "*" and _repeat_too_large(a, b):
+        return node
+    try:
+        result = fn(a, b)
+    except Exception:
+        return node
+    return _literal(result, node)
+
+
+def _repeat_too_large(a, b):
+    # str * int is evaluated before we can look at the result, so check the size up front.
+    if isinstance(a, str) and type(b) is int:
+        return len(a) * b > MAX_FOLDED_STR
+    if isinstance(b, str) and type(a) is int:
+        return len(b) * a > MAX_FOLDED_STR
+    return False
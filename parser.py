@@ -9,19 +9,42 @@ from ast_nodes import (
     NamedArg,
 )
 
+# Binary operator token -> precedence; higher binds tighter. The operator text is the token's value.
+_BINARY_PREC = {
+    "OR": 1,
+    "AND": 2,
+    "EQEQ": 4, "NOTEQ": 4, "LT": 4, "LTE": 4, "GT": 4, "GTE": 4,
+    "PLUS": 5, "MINUS": 5,
+    "STAR": 6, "SLASH": 6,
+}
+_NOT_PREC = 3  # operand of "not" takes comparisons and math, but not and/or
+_COMPARE_PREC = 4
+_COMPARE_OPS = frozenset(t for t, prec in _BINARY_PREC.items() if prec == _COMPARE_PREC)
+
 class Parser:
     def __init__(self, lexer):
         self.lexer = lexer
-        self.current_token = self.lexer.get_next_token()
-        self.next_token = self.lexer.get_next_token()
+        # Tokens are read straight from the lexer's list. A lexing error is raised only when
+        # the bad token would become the lookahead, so parse errors before it come first.
+        self.tokens = lexer.tokens
+        self.pos = 0
+        self._last = len(self.tokens) - 1
+        if self._last < 1 and lexer.error is not None:
+            raise lexer.error
+        self.current_token = self.tokens[0]
         self.function_depth = 0
         self.block_depth = 0
 
     # move to next token, but only if it matches what we expect
-    def eat(self, token_type):
+    def eat(self, token_type: str) -> None:
         if self.current_token.type == token_type:
-            self.current_token = self.next_token
-            self.next_token = self.lexer.get_next_token()
+            i = self.pos + 1
+            if i >= self._last:
+                if self.lexer.error is not None:
+                    raise self.lexer.error
+                i = self._last  # stay on EOF
+            self.pos = i
+            self.current_token = self.tokens[i]
         else:
             tok = self.current_token
             raise Exception(f"Expected {token_type}, got {tok.type} at line {tok.line}, col {tok.column}")
@@ -329,7 +352,7 @@ class Parser:
             self.eat(type_token.type)  # consume TYPE_*
 
             value_expr = self.expr()  # parse right side
-            var_type = self.type_token_to_short(type_token.type)
+            var_type = type_token.value
 
             node = VarAssign(name_token.value, var_type, value_expr)
             node.line = name_token.line
@@ -376,7 +399,7 @@ class Parser:
 
     def call_arg(self):
         # Named arg syntax: name: expr
-        if self.current_token.type == "IDENT" and self.next_token.type == "COLON":
+        if self.current_token.type == "IDENT" and self.tokens[self.pos + 1].type == "COLON":
             name = self.current_token.value
             self.eat("IDENT")
             self.eat("COLON")
@@ -460,7 +483,7 @@ class Parser:
         if self.current_token.type in ("TYPE_STRING", "TYPE_INT", "TYPE_FLOAT", "TYPE_BOOL", "TYPE_LIST", "TYPE_DICT"):
             type_token = self.current_token
             self.eat(type_token.type)
-            return_type = self.type_token_to_short(type_token.type)
+            return_type = type_token.value
 
         self.function_depth += 1
         body = self.block()
@@ -488,7 +511,7 @@ class Parser:
         if self.current_token.type not in ("COMMA", "RPAREN"):
             default_expr = self.expr()
 
-        return (param_name, self.type_token_to_short(type_token.type), default_expr)
+        return (param_name, type_token.value, default_expr)
 
     def return_statement(self):
         tok = self.current_token
@@ -499,50 +522,40 @@ class Parser:
         return node
 
     # ---------- EXPRESSIONS (math + comparisons) ----------
-    # expr -> or_expr
-    def expr(self):
-        return self.or_expr()
-
-    # or_expr -> and_expr (OR and_expr)*
-    def or_expr(self):
-        node = self.and_expr()
-        while self.current_token.type == "OR":
-            self.eat("OR")
-            right = self.and_expr()
-            node = Binary(node, "or", right)
-        return node
-
-    # and_expr -> not_expr (AND not_expr)*
-    def and_expr(self):
-        node = self.not_expr()
-        while self.current_token.type == "AND":
-            self.eat("AND")
-            right = self.not_expr()
-            node = Binary(node, "and", right)
-        return node
-
-    # not_expr -> NOT not_expr | comparison
-    def not_expr(self):
-        if self.current_token.type == "NOT":
+    # expr -> precedence climbing over _BINARY_PREC, lowest to highest:
+    #   or, and, not (prefix), comparisons (chained), + -, * /, unary minus
+    def expr(self, min_prec=1):
+        if self.current_token.type == "NOT" and min_prec <= _NOT_PREC:
             self.eat("NOT")
-            return Unary("not", self.not_expr())
-        return self.comparison()
+            node = Unary("not", self.expr(_NOT_PREC))
+        else:
+            node = self.unary()
 
-    # comparison -> term ((==|!=|<|<=|>|>=) term)*
-    def comparison(self):
-        first = self.term()
+        while True:
+            op_token = self.current_token
+            prec = _BINARY_PREC.get(op_token.type)
+            if prec is None or prec < min_prec:
+                return node
+            if prec == _COMPARE_PREC:
+                node = self.comparison_rest(node)
+                continue
+            self.eat(op_token.type)
+            right = self.expr(prec + 1)
+            node = Binary(node, op_token.value, right)
+            if prec > _COMPARE_PREC:
+                node.line = op_token.line
 
+    # comparison -> first ((==|!=|<|<=|>|>=) operand)*; 2+ operators make a CompareChain
+    def comparison_rest(self, first):
         ops = []
         rest = []
 
-        while self.current_token.type in ("EQEQ", "NOTEQ", "LT", "LTE", "GT", "GTE"):
+        while self.current_token.type in _COMPARE_OPS:
             op_token = self.current_token
             self.eat(op_token.type)
-            ops.append(self.op_token_to_text(op_token.type))
-            rest.append(self.term())
+            ops.append(op_token.value)
+            rest.append(self.expr(_COMPARE_PREC + 1))
 
-        if not ops:
-            return first
         if len(ops) == 1:
             return Binary(first, ops[0], rest[0])
 
@@ -550,32 +563,6 @@ class Parser:
         node.line = getattr(first, "line", None)
         return node
 
-    # term -> factor ((+|-) factor)*
-    def term(self):
-        node = self.factor()
-
-        while self.current_token.type in ("PLUS", "MINUS"):
-            op_token = self.current_token
-            self.eat(op_token.type)
-            right = self.factor()
-            node = Binary(node, self.op_token_to_text(op_token.type), right)
-            node.line = op_token.line
-
-        return node
-
-    # factor -> unary ((*|/) unary)*
-    def factor(self):
-        node = self.unary()
-
-        while self.current_token.type in ("STAR", "SLASH"):
-            op_token = self.current_token
-            self.eat(op_token.type)
-            right = self.unary()
-            node = Binary(node, self.op_token_to_text(op_token.type), right)
-            node.line = op_token.line
-
-        return node
-
     # unary -> (- unary) | primary
     def unary(self):
         if self.current_token.type == "MINUS":
@@ -705,31 +692,3 @@ class Parser:
         node = DictLiteral(pairs)
         node.line = tok.line
         return node
-    # ---------- HELPERS ----------
-    def type_token_to_short(self, type_token):
-        mapping = {
-            "TYPE_STRING": "s",
-            "TYPE_INT": "i",
-            "TYPE_FLOAT": "f",
-            "TYPE_BOOL": "b",
-            "TYPE_LIST": "l",
-            "TYPE_DICT": "d",
-        }
-        return mapping[type_token]
-
-    def op_token_to_text(self, op_type):
-        mapping = {
-            "PLUS": "+",
-            "MINUS": "-",
-            "STAR": "*",
-            "SLASH": "/",
-            "EQEQ": "==",
-            "NOTEQ": "!=",
-            "LT": "<",
-            "LTE": "<=",
-            "GT": ">",
-            "GTE": ">=",
-        }
-        return mapping[op_type]
-
-
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    cli = os.path.join(root, "cli.py")
+    return subprocess.run(
+        [sys.executable, cli, *args],
+        text=True,
+        capture_output=True,
+        cwd=root,
+        timeout=10,
+    )
+
+
+def test_run_reuses_and_refreshes_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "prog.fallen")
+        with open(src, "w", encoding="utf-8") as f:
+            f.write('write("first")\n')
+
+        for _ in range(2):
+            proc = run_cli("run", src)
+            if proc.returncode != 0 or proc.stdout != "first\n":
+                raise AssertionError(f"Unexpected run output.\nSTDOUT:\n{proc.stdout}\nSTDERR:\n{proc.stderr}")
+
+        cache_dir = os.path.join(tmp, "__fallencache__")
+        entries = os.listdir(cache_dir)
+        if len(entries) != 1:
+            raise AssertionError(f"Expected one cache entry, got {entries}")
+
+        # Editing the source must not serve the stale bytecode.
+        with open(src, "w", encoding="utf-8") as f:
+            f.write('write("second")\n')
+        proc = run_cli("run", src)
+        if proc.stdout != "second\n":
+            raise AssertionError(f"Stale cache used.\nSTDOUT:\n{proc.stdout}\nSTDERR:\n{proc.stderr}")
+
+        entries = os.listdir(cache_dir)
+        if len(entries) != 1:
+            raise AssertionError(f"Expected old cache entry to be replaced, got {entries}")
+
+
+if __name__ == "__main__":
+    test_run_reuses_and_refreshes_cache()
+    print("ok")
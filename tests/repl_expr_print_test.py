@@ -35,7 +35,24 @@ def test_persistent_state_expression():
         raise AssertionError(f"Expected 7 in output.\nOUT:\n{out}")
 
 
+def test_consts_keep_their_type_across_snippets():
+    out = run_repl_with_input("x =i 1\nwrite(true)\nwrite(1.0)\n:q\n")
+    if "True" not in out or "1.0" not in out:
+        raise AssertionError(f"Expected True and 1.0 in output.\nOUT:\n{out}")
+
+
+def test_failed_call_does_not_leak_locals():
+    # A runtime error inside a function must not leave its locals visible to later snippets.
+    out = run_repl_with_input(
+        'func f() =i {\n  z =s "local"\n  return 1 / 0\n}\nf()\nz =s "global"\nwrite("{z}")\n:q\n'
+    )
+    if "global" not in out:
+        raise AssertionError(f"Expected global in output.\nOUT:\n{out}")
+
+
 if __name__ == "__main__":
     test_auto_print_expression()
     test_persistent_state_expression()
+    test_consts_keep_their_type_across_snippets()
+    test_failed_call_does_not_leak_locals()
     print("ok")
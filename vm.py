@@ -1,5 +1,17 @@
 import os
 import sys
+from functools import partial
+
+from opcodes import JUMP_OPS, Op
+
+# Marks a function-local slot that has not been assigned yet.
+_UNSET = object()
+
+# Opcodes whose operand is a single variable name (rewritten by _rename_operands).
+_NAME_OPERAND_OPS = frozenset({
+    Op.LOAD_NAME, Op.STORE_NAME, Op.INC_NAME,
+    Op.LOAD_LIST_GET, Op.LOAD_INDEX_GET, Op.LOAD_INDEX_SET, Op.LOAD_APPEND, Op.LOAD_INDEX_REMOVE,
+})
 
 
 class FallenError(Exception):
@@ -53,9 +65,11 @@ class FallenImportError(FallenError):
 
 class VM:
     def __init__(self, bytecode_program, base_dir=None, entry_file: str | None = None, argv=None):
+        self.program = bytecode_program
         self.consts = bytecode_program.consts
-        self.instructions = bytecode_program.instructions
-        self.debug = getattr(bytecode_program, "debug", [None] * len(self.instructions))
+        self.opcodes = bytecode_program.opcodes
+        self.args = bytecode_program.args
+        self.debug = getattr(bytecode_program, "debug", [None] * len(self.opcodes))
         self.functions = getattr(bytecode_program, "functions", {})
 
         self.base_dir = base_dir or os.getcwd()
@@ -69,6 +83,8 @@ class VM:
         self.stack = []             # stack for values
         self.globals = {}           # global variables
         self.env = self.globals     # current local env (globals at top-level)
+        self.fast = None            # current function's local slots (None at top-level)
+        self.fast_names = ()        # slot -> name for self.fast
         self.call_stack = []        # list of frames
 
         self.current_function_name = "<main>"
@@ -77,6 +93,38 @@ class VM:
 
         self.trace_enabled = False
 
+        # builtin name -> bound _builtin_* handler (see CALL_BUILTIN)
+        self._builtins = {
+            "write": self._builtin_write,
+            "enter": self._builtin_enter,
+            "args": self._builtin_args,
+            "conv_int": self._builtin_conv_int,
+            "conv_float": self._builtin_conv_float,
+            "conv_bool": self._builtin_conv_bool,
+            "try_conv_int": self._builtin_try_conv_int,
+            "try_conv_float": self._builtin_try_conv_float,
+            "try_conv_bool": self._builtin_try_conv_bool,
+            "amount": self._builtin_amount,
+            "del": self._builtin_del,
+            "upper": self._builtin_upper,
+            "lower": self._builtin_lower,
+            "split": self._builtin_split,
+            "join": self._builtin_join,
+            "replace": self._builtin_replace,
+            "insert": self._builtin_insert,
+            "save": self._builtin_save,
+            "append": self._builtin_append,
+            "change": self._builtin_append,
+            "load": self._builtin_load,
+            "read": self._builtin_load,
+        }
+
+        # opcode value -> bound _op_* handler, so step() dispatches with one list index.
+        # Byte values that are not opcodes raise "Unknown opcode".
+        self._handlers = [partial(self._unknown_opcode, code) for code in range(256)]
+        for op in Op:
+            self._handlers[op] = getattr(self, f"_op_{op.name.lower()}")
+
         # Script arguments passed from the CLI (strings only)
         if argv is None:
             self.argv = []
@@ -122,7 +170,10 @@ class VM:
                 if not self._is_ident(name):
                     raise Exception("Invalid format string")
 
-                if name in self.env:
+                slot = self.fast_names.index(name) if name in self.fast_names else None
+                if slot is not None and self.fast[slot] is not _UNSET:
+                    value = self.fast[slot]
+                elif name in self.env:
                     value = self.env[name]
                 elif name in self.globals:
                     value = self.globals[name]
@@ -141,15 +192,8 @@ class VM:
         return "".join(out)
 
     def add_const(self, value):
-        # reuse constants if already added
-        try:
-            if value in self.consts:
-                return self.consts.index(value)
-        except Exception:
-            # fallback: just append
-            pass
-        self.consts.append(value)
-        return len(self.consts) - 1
+        # reuse constants if already added (same type-aware dedup as the compiler)
+        return self.program.add_const(value)
 
     def resolve_path(self, path: str) -> str:
         if os.path.isabs(path):
@@ -217,7 +261,7 @@ class VM:
     def check_ip(self, target: int, context: str):
         if not isinstance(target, int):
             raise Exception(f"Invalid jump target for {context}: {target}")
-        if target < 0 or target >= len(self.instructions):
+        if target < 0 or target >= len(self.opcodes):
             raise Exception(f"Invalid jump target for {context}: {target}")
 
     def pop(self):
@@ -305,51 +349,47 @@ class VM:
             raise Exception(f"Return type mismatch in {func_name}(): expected {type_code}, got {got}")
 
     def link_bytecode(self, bc):
-        base_ip = len(self.instructions)
+        base_ip = len(self.opcodes)
 
         const_map = {}
         for i, c in enumerate(bc.consts):
             const_map[i] = self.add_const(c)
 
-        for opcode, arg in bc.instructions:
-            if opcode == "LOAD_CONST":
-                self.instructions.append((opcode, const_map[arg]))
-                continue
-            if opcode in ("JUMP", "JUMP_IF_FALSE"):
+        for opcode, arg in zip(bc.opcodes, bc.args):
+            if opcode == Op.LOAD_CONST:
+                arg = const_map[arg]
+            elif opcode in JUMP_OPS:
                 if arg is None:
                     raise Exception(f"Invalid jump target in imported module: {arg}")
-                self.instructions.append((opcode, arg + base_ip))
-                continue
-            self.instructions.append((opcode, arg))
+                arg = arg + base_ip
+            elif opcode == Op.SWITCH:
+                table, default = arg
+                arg = ({k: t + base_ip for k, t in table.items()}, default + base_ip)
+            self.opcodes.append(opcode)
+            self.args.append(arg)
 
         # debug info
         bc_debug = getattr(bc, "debug", None)
         if bc_debug is None:
-            bc_debug = [None] * len(bc.instructions)
-        for opcode, dbg in zip(bc.instructions, bc_debug, strict=False):
-            self.debug.append(dbg)
+            bc_debug = [None] * len(bc.opcodes)
+        self.debug.extend(bc_debug[:len(bc.opcodes)])
 
         for name, meta in getattr(bc, "functions", {}).items():
-            entry = meta.get("entry")
-            if entry is None:
+            if meta.entry is None:
                 continue
             if name in self.functions:
                 raise Exception(f"Function already defined: {name}")
-            self.functions[name] = {
-                "entry": entry + base_ip,
-                "params": list(meta.get("params", [])),
-                "file": meta.get("file"),
-            }
+            self.functions[name] = meta._replace(entry=meta.entry + base_ip)
 
-        return base_ip, len(self.instructions)
+        return base_ip, len(self.opcodes)
 
     def run_range(self, start_ip: int, end_ip: int):
         saved_ip = self.ip
         self.ip = start_ip
         try:
+            step = self.step
             while self.ip < end_ip:
-                halted = self.step()
-                if halted:
+                if step():
                     break
         finally:
             self.ip = saved_ip
@@ -413,10 +453,12 @@ class VM:
             start_ip, end_ip = self.link_bytecode(bc)
 
             saved_env = self.env
+            saved_fast, saved_fast_names = self.fast, self.fast_names
             saved_func = self.current_function_name
             saved_file = self.current_file_path
             saved_ip = self.ip
             self.env = self.globals
+            self.fast, self.fast_names = None, ()
             self.current_function_name = "<module>"
             self.current_file_path = module_path
             try:
@@ -432,6 +474,7 @@ class VM:
                     raise FallenImportError(path, inner=FallenRuntimeError(str(e), ip=self.ip, frames=self.build_stacktrace()))
             finally:
                 self.env = saved_env
+                self.fast, self.fast_names = saved_fast, saved_fast_names
                 self.current_function_name = saved_func
                 self.current_file_path = saved_file
                 self.ip = saved_ip
@@ -452,624 +495,883 @@ class VM:
         mapping = {name: f"{prefix}{name}" for name in private}
 
         # Rewrite instruction operands.
-        new_instructions = []
-        for opcode, arg in bc.instructions:
-            if opcode in ("LOAD_NAME", "STORE_NAME") and isinstance(arg, str) and arg in mapping:
-                arg = mapping[arg]
-            elif opcode == "CALL_FUNC":
-                if isinstance(arg, tuple) and len(arg) == 3:
-                    name, argc, arg_names = arg
-                    if name in mapping:
-                        arg = (mapping[name], argc, arg_names)
-                else:
-                    name, argc = arg
-                    if name in mapping:
-                        arg = (mapping[name], argc)
-            new_instructions.append((opcode, arg))
-        bc.instructions = new_instructions
+        self._rename_operands(bc, mapping)
 
         # Rewrite function table keys.
+        self._rename_functions(bc, mapping)
+
+    def _rename_functions(self, bc, mapping):
+        # Function table keys, plus local slot names (an unset local reads the global by name).
         new_functions = {}
         for name, meta in getattr(bc, "functions", {}).items():
             new_name = mapping.get(name, name)
-            new_functions[new_name] = meta
+            local_names = tuple(mapping.get(n, n) for n in meta.local_names)
+            new_functions[new_name] = meta._replace(local_names=local_names)
         bc.functions = new_functions
 
-    def _apply_import_alias(self, bc, alias: str):
-        _, public, _ = self._module_public_symbols(bc)
-        if not public:
-            return
-
-        mapping = {name: f"{alias}_{name}" for name in public}
-
-        new_instructions = []
-        for opcode, arg in bc.instructions:
-            if opcode in ("LOAD_NAME", "STORE_NAME") and isinstance(arg, str) and arg in mapping:
-                arg = mapping[arg]
-            elif opcode == "CALL_FUNC":
+    def _rename_operands(self, bc, mapping):
+        # Rewrite name operands in place (opcodes are untouched).
+        args = bc.args
+        for i, opcode in enumerate(bc.opcodes):
+            arg = args[i]
+            if opcode in _NAME_OPERAND_OPS and isinstance(arg, str) and arg in mapping:
+                args[i] = mapping[arg]
+            elif opcode == Op.MOVE_NAME:
+                src, dst = arg
+                args[i] = (mapping.get(src, src), mapping.get(dst, dst))
+            elif opcode == Op.CALL_FUNC or opcode == Op.CALL_VOID:
                 if isinstance(arg, tuple) and len(arg) == 3:
                     name, argc, arg_names = arg
                     if name in mapping:
-                        arg = (mapping[name], argc, arg_names)
+                        args[i] = (mapping[name], argc, arg_names)
                 else:
                     name, argc = arg
                     if name in mapping:
-                        arg = (mapping[name], argc)
-            new_instructions.append((opcode, arg))
-        bc.instructions = new_instructions
+                        args[i] = (mapping[name], argc)
 
-        new_functions = {}
-        for name, meta in getattr(bc, "functions", {}).items():
-            new_name = mapping.get(name, name)
-            new_functions[new_name] = meta
-        bc.functions = new_functions
+    def _apply_import_alias(self, bc, alias: str):
+        _, public, _ = self._module_public_symbols(bc)
+        if not public:
+            return
 
-    def step(self) -> bool:
-        self.check_ip(self.ip, "ip")
-        opcode, arg = self.instructions[self.ip]
+        mapping = {name: f"{alias}_{name}" for name in public}
 
-        if self.trace_enabled:
-            print(f"TRACE ip={self.ip:04d} {(opcode, arg)!r} stack={len(self.stack)}")
+        self._rename_operands(bc, mapping)
+        self._rename_functions(bc, mapping)
+
+    def _load_name(self, name):
+        # LOAD_NAME lookup: current frame, then globals.
+        if name in self.env:
+            return self.env[name]
+        if name in self.globals:
+            return self.globals[name]
+        raise Exception(f"Undefined name: {name}")
+
+    def _list_get(self, target, index):
+        if not isinstance(target, list):
+            raise Exception("target not a list")
+        if not isinstance(index, int):
+            raise Exception("index not integer")
+        if index < 0 or index >= len(target):
+            raise Exception("index out of range")
+        return target[index]
+
+    def _list_append(self, target, value):
+        if not isinstance(target, list):
+            raise Exception("target not a list")
+        target.append(value)
+
+    def _index_get(self, target, key):
+        if isinstance(target, list):
+            if not isinstance(key, int):
+                raise Exception("index not integer")
+            if key < 0 or key >= len(target):
+                raise Exception("index out of range")
+            return target[key]
+        if isinstance(target, dict):
+            if not isinstance(key, str):
+                raise Exception("dict key must be string")
+            if key not in target:
+                raise Exception(f"key not found: {key}")
+            return target[key]
+        raise Exception("target not indexable")
+
+    def _index_set(self, target, key, value):
+        if isinstance(target, list):
+            if not isinstance(key, int):
+                raise Exception("index not integer")
+            if key < 0 or key >= len(target):
+                raise Exception("index out of range")
+            target[key] = value
+        elif isinstance(target, dict):
+            if not isinstance(key, str):
+                raise Exception("dict key must be string")
+            target[key] = value
+        else:
+            raise Exception("target not indexable")
 
-        if opcode == "SET_TRACE":
-            self.trace_enabled = bool(arg)
-            self.ip += 1
-            return False
+    def _index_remove(self, target, key):
+        if isinstance(target, list):
+            if not isinstance(key, int):
+                raise Exception("index not integer")
+            if key < 0 or key >= len(target):
+                raise Exception("index out of range")
+            del target[key]
+        elif isinstance(target, dict):
+            if not isinstance(key, str):
+                raise Exception("dict key must be string")
+            if key not in target:
+                raise Exception(f"key not found: {key}")
+            del target[key]
+        else:
+            raise Exception("target not indexable")
+
+    def _call_function(self, meta, name, argc, arg_names, void=False):
+        # CALL_FUNC: bind the popped arguments to parameters and enter the function body.
+        entry, param_names, defaults, _ret_type, func_file, local_names = meta
+        expected = len(param_names)
+
+        args = []
+        for _ in range(argc):
+            args.append(self.pop())
+        args.reverse()
+
+        if arg_names is not None:
+            if not isinstance(arg_names, list) or len(arg_names) != argc:
+                raise Exception("Invalid call argument metadata")
+            positional = []
+            named = []
+            for nm, val in zip(arg_names, args, strict=False):
+                if nm is None:
+                    positional.append(val)
+                else:
+                    named.append((nm, val))
+        else:
+            positional = args
+            named = []
+
+        if len(positional) > expected:
+            raise Exception(f"{name}() expects at most {expected} positional arguments, got {len(positional)}")
+
+        assigned = {}
+        for i, val in enumerate(positional):
+            assigned[param_names[i]] = val
+
+        param_set = set(param_names)
+        for nm, val in named:
+            if nm not in param_set:
+                raise Exception(f"{name}() got an unexpected named argument: {nm}")
+            if nm in assigned:
+                raise Exception(f"{name}() got multiple values for argument: {nm}")
+            assigned[nm] = val
+
+        final_args = []
+        for pname in param_names:
+            if pname in assigned:
+                final_args.append(assigned[pname])
+            elif pname in defaults:
+                final_args.append(defaults[pname])
+            else:
+                raise Exception(f"{name}() missing required argument: {pname}")
+
+        if len(self.call_stack) >= self.MAX_CALL_DEPTH:
+            raise Exception(f"Max call depth exceeded ({self.MAX_CALL_DEPTH})")
+
+        call_ip = self.ip
+        dbg = self._debug_at_ip(call_ip) or {}
+        self.call_stack.append({
+            "return_ip": self.ip + 1,
+            "caller_env": self.env,
+            "caller_fast": self.fast,
+            "caller_fast_names": self.fast_names,
+            "caller_func": self.current_function_name,
+            "caller_file": self.current_file_path,
+            "call_ip": call_ip,
+            "call_file": dbg.get("file"),
+            "call_line": dbg.get("line"),
+            "meta": meta,
+            "void": void,
+        })
 
-        if opcode == "LOAD_CONST":
-            self.stack.append(self.consts[arg])
-            self.ip += 1
-            return False
+        # parameters occupy the first slots, in order
+        final_args.extend([_UNSET] * (len(local_names) - expected))
+        self.env = {}
+        self.fast = final_args
+        self.fast_names = local_names
+
+        self.current_function_name = name
+        self.current_file_path = func_file or self.current_file_path
+        self.check_ip(entry, "call")
+        self.ip = entry
+        return False
+
+    # -------- builtins: _builtin_<name>(name, argc, args) pushes its result (write pushes nothing) --------
+    def _builtin_write(self, name, argc, args):
+        if argc not in (1, 2):
+            raise Exception("write() must have 1 or 2 arguments")
+
+        text = str(args[0])
+        color = None
+        if argc == 2:
+            color = str(args[1]).strip().lower()
+
+        ansi_colors = {
+            "gray": "90",
+            "red": "31",
+            "green": "32",
+            "yellow": "33",
+            "blue": "34",
+            "magenta": "35",
+            "cyan": "36",
+            "white": "37",
+        }
+
+        def apply_color(s: str, cname: str | None) -> str:
+            if not cname:
+                return s
+            code = ansi_colors.get(cname)
+            if not code:
+                return s
+            self._ensure_colorama()
+            return f"\x1b[{code}m{s}\x1b[0m"
+
+        # Tagged text form: [red]...[/red]
+        if color is None and "[" in text and "]" in text:
+            for cname in ansi_colors.keys():
+                open_tag = f"[{cname}]"
+                close_tag = f"[/{cname}]"
+                i = text.find(open_tag)
+                if i == -1:
+                    continue
+                j = text.find(close_tag, i + len(open_tag))
+                if j == -1:
+                    continue
+                inner = text[i + len(open_tag) : j]
+                text = text[:i] + apply_color(inner, cname) + text[j + len(close_tag) :]
+                break
+
+        # Arg form: write(text, "red")
+        text = apply_color(text, color)
+        print(text)
+
+    def _builtin_enter(self, name, argc, args):
+        if argc != 1:
+            raise Exception("enter() must have exactly 1 argument")
+        prompt = str(args[0])
+        self.stack.append(input(prompt))
+
+    def _builtin_args(self, name, argc, args):
+        if argc != 0:
+            raise Exception("args() must have exactly 0 arguments")
+        self.stack.append(list(self.argv))
+
+    def _builtin_conv_int(self, name, argc, args):
+        if argc != 1:
+            raise Exception("conv_int() must have exactly 1 argument")
+        self.stack.append(self.conv_int(args[0]))
+
+    def _builtin_conv_float(self, name, argc, args):
+        if argc != 1:
+            raise Exception("conv_float() must have exactly 1 argument")
+        self.stack.append(self.conv_float(args[0]))
+
+    def _builtin_conv_bool(self, name, argc, args):
+        if argc != 1:
+            raise Exception("conv_bool() must have exactly 1 argument")
+        self.stack.append(self.conv_bool(args[0]))
+
+    def _builtin_try_conv_int(self, name, argc, args):
+        if argc != 1:
+            raise Exception("try_conv_int() must have exactly 1 argument")
+        try:
+            self.stack.append(self.conv_int(args[0]))
+        except Exception:
+            self.stack.append(None)
 
-        if opcode == "FORMAT_STRING":
-            fmt = self.pop()
-            if not isinstance(fmt, str):
-                raise Exception("format string must be a string")
-            self.stack.append(self._format_string(fmt))
-            self.ip += 1
-            return False
+    def _builtin_try_conv_float(self, name, argc, args):
+        if argc != 1:
+            raise Exception("try_conv_float() must have exactly 1 argument")
+        try:
+            self.stack.append(self.conv_float(args[0]))
+        except Exception:
+            self.stack.append(None)
 
-        if opcode == "LOAD_NAME":
-            name = arg
-            if name in self.env:
-                self.stack.append(self.env[name])
-            elif name in self.globals:
-                self.stack.append(self.globals[name])
-            else:
-                raise Exception(f"Undefined name: {name}")
-            self.ip += 1
-            return False
+    def _builtin_try_conv_bool(self, name, argc, args):
+        if argc != 1:
+            raise Exception("try_conv_bool() must have exactly 1 argument")
+        try:
+            self.stack.append(self.conv_bool(args[0]))
+        except Exception:
+            self.stack.append(None)
+
+    def _builtin_amount(self, name, argc, args):
+        if argc != 1:
+            raise Exception("amount() must have exactly 1 argument")
+        v = args[0]
+        if isinstance(v, (list, str)):
+            self.stack.append(len(v))
+        else:
+            raise Exception("amount() expects list or string")
+
+    def _builtin_del(self, name, argc, args):
+        if argc != 1:
+            raise Exception("del() must have exactly 1 argument")
+        v = args[0]
+        if not isinstance(v, list):
+            raise Exception("target not a list")
+        if len(v) == 0:
+            raise Exception("del() on empty list")
+        self.stack.append(v.pop())
+
+    def _builtin_upper(self, name, argc, args):
+        if argc != 1:
+            raise Exception("upper() must have exactly 1 argument")
+        self.stack.append(str(args[0]).upper())
+
+    def _builtin_lower(self, name, argc, args):
+        if argc != 1:
+            raise Exception("lower() must have exactly 1 argument")
+        self.stack.append(str(args[0]).lower())
+
+    def _builtin_split(self, name, argc, args):
+        if argc != 2:
+            raise Exception("split() must have exactly 2 arguments")
+        s = str(args[0])
+        sep = str(args[1])
+        self.stack.append(s.split(sep))
+
+    def _builtin_join(self, name, argc, args):
+        if argc != 2:
+            raise Exception("join() must have exactly 2 arguments")
+        items = args[0]
+        sep = str(args[1])
+        if not isinstance(items, list):
+            raise Exception("join() expects a list")
+        self.stack.append(sep.join(str(x) for x in items))
+
+    def _builtin_replace(self, name, argc, args):
+        if argc != 3:
+            raise Exception("replace() must have exactly 3 arguments")
+        s = str(args[0])
+        old = str(args[1])
+        new = str(args[2])
+        self.stack.append(s.replace(old, new))
+
+    def _builtin_insert(self, name, argc, args):
+        if argc != 3:
+            raise Exception("insert() must have exactly 3 arguments")
+        target = args[0]
+        index = args[1]
+        value = args[2]
+        if not isinstance(target, list):
+            raise Exception("insert() expects a list")
+        if not isinstance(index, int):
+            raise Exception("insert() index must be int")
+        if index < 0 or index > len(target):
+            raise Exception("insert() index out of range")
+        target.insert(index, value)
+        self.stack.append(True)
+
+    def _builtin_save(self, name, argc, args):
+        if argc != 2:
+            raise Exception("save() must have exactly 2 arguments")
+        path = self.resolve_path(str(args[0]))
+        text = str(args[1])
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            raise Exception(f"cannot write file: {path}")
+        self.stack.append(True)
+
+    def _builtin_append(self, name, argc, args):
+        if argc != 2:
+            raise Exception(f"{name}() must have exactly 2 arguments")
+        path = self.resolve_path(str(args[0]))
+        text = str(args[1])
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            raise Exception(f"cannot write file: {path}")
+        self.stack.append(True)
 
-        if opcode == "STORE_NAME":
-            self.env[arg] = self.pop()
-            self.ip += 1
-            return False
+    def _builtin_load(self, name, argc, args):
+        if argc != 1:
+            raise Exception(f"{name}() must have exactly 1 argument")
+        path = self.resolve_path(str(args[0]))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = f.read()
+        except Exception:
+            raise Exception(f"cannot read file: {path}")
+        self.stack.append(data)
 
-        if opcode == "POP":
-            self.pop()
-            self.ip += 1
-            return False
+    def step(self) -> bool:
+        self.check_ip(self.ip, "ip")
+        opcode = self.opcodes[self.ip]
+        arg = self.args[self.ip]
 
-        if opcode == "DUP":
-            if not self.stack:
-                raise Exception("Stack underflow")
-            self.stack.append(self.stack[-1])
-            self.ip += 1
-            return False
+        if self.trace_enabled:
+            self._trace(opcode, arg)
 
-        if opcode in ("ADD", "SUB", "MUL", "DIV"):
-            b = self.pop()
-            a = self.pop()
-            try:
-                if opcode == "ADD":
-                    self.stack.append(a + b)
-                elif opcode == "SUB":
-                    self.stack.append(a - b)
-                elif opcode == "MUL":
-                    self.stack.append(a * b)
-                else:
-                    self.stack.append(a / b)
-            except Exception as e:
-                raise Exception(str(e))
-            self.ip += 1
-            return False
+        return self._handlers[opcode](arg)
 
-        if opcode.startswith("CMP_"):
-            b = self.pop()
-            a = self.pop()
-            if opcode == "CMP_EQ":
-                self.stack.append(a == b)
-            elif opcode == "CMP_NE":
-                self.stack.append(a != b)
-            elif opcode == "CMP_LT":
-                self.stack.append(a < b)
-            elif opcode == "CMP_LE":
-                self.stack.append(a <= b)
-            elif opcode == "CMP_GT":
-                self.stack.append(a > b)
-            elif opcode == "CMP_GE":
-                self.stack.append(a >= b)
-            else:
-                raise Exception(f"Unknown compare opcode: {opcode}")
-            self.ip += 1
-            return False
+    def _trace(self, opcode, arg):
+        # Quickened instructions are shown in the form the compiler emitted.
+        if opcode == Op.CALL_BUILTIN_FAST:
+            opcode, arg = Op.CALL_BUILTIN, arg[1:]
+        elif opcode == Op.CALL_FUNC_CACHED:
+            _meta, name, argc, arg_names, void = arg
+            opcode = Op.CALL_VOID if void else Op.CALL_FUNC
+            arg = (name, argc) if arg_names is None else (name, argc, arg_names)
+        print(f"TRACE ip={self.ip:04d} {(Op(opcode).name, arg)!r} stack={len(self.stack)}")
 
-        if opcode == "NOT":
-            a = self.require_bool(self.pop(), "not")
-            self.stack.append(not a)
-            self.ip += 1
-            return False
+    def _unknown_opcode(self, opcode, arg):
+        raise Exception(f"Unknown opcode: {opcode}")
 
-        if opcode == "BUILD_LIST":
-            count = arg
-            items = []
-            for _ in range(count):
-                items.append(self.pop())
-            items.reverse()
-            self.stack.append(items)
-            self.ip += 1
-            return False
+    # -------- opcode handlers: _op_<name>(arg) -> True when execution should halt --------
+    def _op_set_trace(self, arg):
+        self.trace_enabled = bool(arg)
+        self.ip += 1
+        return False
+
+    def _op_load_const(self, arg):
+        self.stack.append(self.consts[arg])
+        self.ip += 1
+        return False
+
+    def _op_format_string(self, arg):
+        fmt = self.pop()
+        if not isinstance(fmt, str):
+            raise Exception("format string must be a string")
+        self.stack.append(self._format_string(fmt))
+        self.ip += 1
+        return False
+
+    def _op_load_name(self, arg):
+        name = arg
+        if name in self.env:
+            self.stack.append(self.env[name])
+        elif name in self.globals:
+            self.stack.append(self.globals[name])
+        else:
+            raise Exception(f"Undefined name: {name}")
+        self.ip += 1
+        return False
+
+    def _op_store_name(self, arg):
+        self.env[arg] = self.pop()
+        self.ip += 1
+        return False
+
+    def _op_load_fast(self, arg):
+        value = self.fast[arg]
+        if value is _UNSET:
+            # not assigned yet in this call: read the global, as LOAD_NAME would
+            name = self.fast_names[arg]
+            if name not in self.globals:
+                raise Exception(f"Undefined name: {name}")
+            value = self.globals[name]
+        self.stack.append(value)
+        self.ip += 1
+        return False
+
+    def _op_store_fast(self, arg):
+        self.fast[arg] = self.pop()
+        self.ip += 1
+        return False
+
+    def _op_inc_name(self, arg):
+        env = self.env
+        env[arg] = env[arg] + 1
+        self.ip += 1
+        return False
+
+    def _op_inc_fast(self, arg):
+        self.fast[arg] += 1
+        self.ip += 1
+        return False
+
+    def _op_move_fast(self, arg):
+        src, dst = arg
+        fast = self.fast
+        value = fast[src]
+        if value is _UNSET:
+            name = self.fast_names[src]
+            if name not in self.globals:
+                raise Exception(f"Undefined name: {name}")
+            value = self.globals[name]
+        fast[dst] = value
+        self.ip += 1
+        return False
+
+    def _op_move_name(self, arg):
+        src, dst = arg
+        env = self.env
+        if src in env:
+            env[dst] = env[src]
+        elif src in self.globals:
+            env[dst] = self.globals[src]
+        else:
+            raise Exception(f"Undefined name: {src}")
+        self.ip += 1
+        return False
 
-        if opcode == "BUILD_DICT":
-            count = arg
-            d = {}
-            for _ in range(count):
-                value = self.pop()
-                key = self.pop()
-                if not isinstance(key, str):
-                    raise Exception("dict keys must be strings")
-                d[key] = value
-            self.stack.append(d)
-            self.ip += 1
-            return False
+    def _op_pop(self, arg):
+        self.pop()
+        self.ip += 1
+        return False
 
-        if opcode == "LIST_GET":
-            index = self.pop()
-            target = self.pop()
-            if not isinstance(target, list):
-                raise Exception("target not a list")
-            if not isinstance(index, int):
-                raise Exception("index not integer")
-            if index < 0 or index >= len(target):
-                raise Exception("index out of range")
-            self.stack.append(target[index])
-            self.ip += 1
-            return False
+    def _op_dup(self, arg):
+        if not self.stack:
+            raise Exception("Stack underflow")
+        self.stack.append(self.stack[-1])
+        self.ip += 1
+        return False
+
+    # Binary ops replace the left operand in place instead of popping both and pushing.
+    def _op_add(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        try:
+            stack[-1] = stack[-1] + b
+        except Exception as e:
+            raise Exception(str(e))
+        self.ip += 1
+        return False
 
-        if opcode == "LIST_APPEND":
-            value = self.pop()
-            target = self.pop()
-            if not isinstance(target, list):
-                raise Exception("target not a list")
-            target.append(value)
-            self.ip += 1
-            return False
+    def _op_sub(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        try:
+            stack[-1] = stack[-1] - b
+        except Exception as e:
+            raise Exception(str(e))
+        self.ip += 1
+        return False
 
-        if opcode == "INDEX_GET":
-            key = self.pop()
-            target = self.pop()
-            if isinstance(target, list):
-                if not isinstance(key, int):
-                    raise Exception("index not integer")
-                if key < 0 or key >= len(target):
-                    raise Exception("index out of range")
-                self.stack.append(target[key])
-            elif isinstance(target, dict):
-                if not isinstance(key, str):
-                    raise Exception("dict key must be string")
-                if key not in target:
-                    raise Exception(f"key not found: {key}")
-                self.stack.append(target[key])
-            else:
-                raise Exception("target not indexable")
-            self.ip += 1
-            return False
+    def _op_mul(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        try:
+            stack[-1] = stack[-1] * b
+        except Exception as e:
+            raise Exception(str(e))
+        self.ip += 1
+        return False
 
-        if opcode == "INDEX_SET":
+    def _op_div(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        try:
+            stack[-1] = stack[-1] / b
+        except Exception as e:
+            raise Exception(str(e))
+        self.ip += 1
+        return False
+
+    def _op_cmp_eq(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        stack[-1] = stack[-1] == b
+        self.ip += 1
+        return False
+
+    def _op_cmp_ne(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        stack[-1] = stack[-1] != b
+        self.ip += 1
+        return False
+
+    def _op_cmp_lt(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        stack[-1] = stack[-1] < b
+        self.ip += 1
+        return False
+
+    def _op_cmp_le(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        stack[-1] = stack[-1] <= b
+        self.ip += 1
+        return False
+
+    def _op_cmp_gt(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        stack[-1] = stack[-1] > b
+        self.ip += 1
+        return False
+
+    def _op_cmp_ge(self, arg):
+        stack = self.stack
+        if len(stack) < 2:
+            raise Exception("Stack underflow")
+        b = stack.pop()
+        stack[-1] = stack[-1] >= b
+        self.ip += 1
+        return False
+
+    def _op_not(self, arg):
+        a = self.require_bool(self.pop(), "not")
+        self.stack.append(not a)
+        self.ip += 1
+        return False
+
+    def _op_build_list(self, arg):
+        count = arg
+        items = []
+        for _ in range(count):
+            items.append(self.pop())
+        items.reverse()
+        self.stack.append(items)
+        self.ip += 1
+        return False
+
+    def _op_build_dict(self, arg):
+        count = arg
+        d = {}
+        for _ in range(count):
             value = self.pop()
             key = self.pop()
-            target = self.pop()
-            if isinstance(target, list):
-                if not isinstance(key, int):
-                    raise Exception("index not integer")
-                if key < 0 or key >= len(target):
-                    raise Exception("index out of range")
-                target[key] = value
-            elif isinstance(target, dict):
-                if not isinstance(key, str):
-                    raise Exception("dict key must be string")
-                target[key] = value
-            else:
-                raise Exception("target not indexable")
+            if not isinstance(key, str):
+                raise Exception("dict keys must be strings")
+            d[key] = value
+        self.stack.append(d)
+        self.ip += 1
+        return False
+
+    def _op_build_list_from_const(self, arg):
+        self.stack.append(list(self.pop()))
+        self.ip += 1
+        return False
+
+    def _op_build_dict_from_const(self, arg):
+        # pairs are stored in BUILD_DICT's pop order, so dict() gives the same result
+        self.stack.append(dict(self.pop()))
+        self.ip += 1
+        return False
+
+    def _op_list_get(self, arg):
+        index = self.pop()
+        target = self.pop()
+        self.stack.append(self._list_get(target, index))
+        self.ip += 1
+        return False
+
+    def _op_list_append(self, arg):
+        value = self.pop()
+        target = self.pop()
+        self._list_append(target, value)
+        self.ip += 1
+        return False
+
+    def _op_index_get(self, arg):
+        key = self.pop()
+        target = self.pop()
+        self.stack.append(self._index_get(target, key))
+        self.ip += 1
+        return False
+
+    def _op_index_set(self, arg):
+        value = self.pop()
+        key = self.pop()
+        target = self.pop()
+        self._index_set(target, key, value)
+        self.ip += 1
+        return False
+
+    def _op_index_remove(self, arg):
+        key = self.pop()
+        target = self.pop()
+        self._index_remove(target, key)
+        self.ip += 1
+        return False
+
+    # Fused forms: the target comes from the name operand instead of the stack.
+    def _op_load_list_get(self, arg):
+        index = self.pop()
+        self.stack.append(self._list_get(self._load_name(arg), index))
+        self.ip += 1
+        return False
+
+    def _op_load_index_get(self, arg):
+        key = self.pop()
+        self.stack.append(self._index_get(self._load_name(arg), key))
+        self.ip += 1
+        return False
+
+    def _op_load_index_set(self, arg):
+        value = self.pop()
+        key = self.pop()
+        self._index_set(self._load_name(arg), key, value)
+        self.ip += 1
+        return False
+
+    def _op_load_append(self, arg):
+        value = self.pop()
+        self._list_append(self._load_name(arg), value)
+        self.ip += 1
+        return False
+
+    def _op_load_index_remove(self, arg):
+        key = self.pop()
+        self._index_remove(self._load_name(arg), key)
+        self.ip += 1
+        return False
+
+    def _op_jump(self, arg):
+        self.check_ip(arg, "jump")
+        self.ip = arg
+        return False
+
+    def _op_switch(self, arg):
+        table, default = arg
+        value = self.pop()
+        try:
+            target = table.get(value, default)
+        except TypeError:
+            # lists/dicts are unhashable and never equal a case literal
+            target = default
+        self.check_ip(target, "jump")
+        self.ip = target
+        return False
+
+    def _op_jump_if_false(self, arg):
+        condition = self.require_bool(self.pop(), "condition")
+        if condition is False:
+            self.check_ip(arg, "jump")
+            self.ip = arg
+        else:
             self.ip += 1
-            return False
+        return False
 
-        if opcode == "INDEX_REMOVE":
-            key = self.pop()
-            target = self.pop()
-            if isinstance(target, list):
-                if not isinstance(key, int):
-                    raise Exception("index not integer")
-                if key < 0 or key >= len(target):
-                    raise Exception("index out of range")
-                del target[key]
-            elif isinstance(target, dict):
-                if not isinstance(key, str):
-                    raise Exception("dict key must be string")
-                if key not in target:
-                    raise Exception(f"key not found: {key}")
-                del target[key]
-            else:
-                raise Exception("target not indexable")
+    def _op_jump_if_false_or_pop(self, arg):
+        if not self.stack:
+            raise Exception("Stack underflow")
+        if self.require_bool(self.stack[-1], "condition") is False:
+            self.check_ip(arg, "jump")
+            self.ip = arg
+        else:
+            self.stack.pop()
             self.ip += 1
-            return False
+        return False
 
-        if opcode == "JUMP":
+    def _op_jump_if_true_or_pop(self, arg):
+        if not self.stack:
+            raise Exception("Stack underflow")
+        if self.require_bool(self.stack[-1], "condition") is True:
             self.check_ip(arg, "jump")
             self.ip = arg
-            return False
-
-        if opcode == "JUMP_IF_FALSE":
-            condition = self.require_bool(self.pop(), "condition")
-            if condition is False:
-                self.check_ip(arg, "jump")
-                self.ip = arg
-            else:
-                self.ip += 1
-            return False
-
-        if opcode == "CALL_BUILTIN":
-            name, argc = arg
-            args = []
-            for _ in range(argc):
-                args.append(self.pop())
-            args.reverse()
-
-            if name == "write":
-                if argc not in (1, 2):
-                    raise Exception("write() must have 1 or 2 arguments")
-
-                text = str(args[0])
-                color = None
-                if argc == 2:
-                    color = str(args[1]).strip().lower()
-
-                ansi_colors = {
-                    "gray": "90",
-                    "red": "31",
-                    "green": "32",
-                    "yellow": "33",
-                    "blue": "34",
-                    "magenta": "35",
-                    "cyan": "36",
-                    "white": "37",
-                }
-
-                def apply_color(s: str, cname: str | None) -> str:
-                    if not cname:
-                        return s
-                    code = ansi_colors.get(cname)
-                    if not code:
-                        return s
-                    self._ensure_colorama()
-                    return f"\x1b[{code}m{s}\x1b[0m"
-
-                # Tagged text form: [red]...[/red]
-                if color is None and "[" in text and "]" in text:
-                    for cname in ansi_colors.keys():
-                        open_tag = f"[{cname}]"
-                        close_tag = f"[/{cname}]"
-                        i = text.find(open_tag)
-                        if i == -1:
-                            continue
-                        j = text.find(close_tag, i + len(open_tag))
-                        if j == -1:
-                            continue
-                        inner = text[i + len(open_tag) : j]
-                        text = text[:i] + apply_color(inner, cname) + text[j + len(close_tag) :]
-                        break
-
-                # Arg form: write(text, "red")
-                text = apply_color(text, color)
-                print(text)
-
-            elif name == "enter":
-                if argc != 1:
-                    raise Exception("enter() must have exactly 1 argument")
-                prompt = str(args[0])
-                self.stack.append(input(prompt))
-
-            elif name == "args":
-                if argc != 0:
-                    raise Exception("args() must have exactly 0 arguments")
-                self.stack.append(list(self.argv))
-
-            elif name == "conv_int":
-                if argc != 1:
-                    raise Exception("conv_int() must have exactly 1 argument")
-                self.stack.append(self.conv_int(args[0]))
-            elif name == "conv_float":
-                if argc != 1:
-                    raise Exception("conv_float() must have exactly 1 argument")
-                self.stack.append(self.conv_float(args[0]))
-            elif name == "conv_bool":
-                if argc != 1:
-                    raise Exception("conv_bool() must have exactly 1 argument")
-                self.stack.append(self.conv_bool(args[0]))
-
-            elif name == "try_conv_int":
-                if argc != 1:
-                    raise Exception("try_conv_int() must have exactly 1 argument")
-                try:
-                    self.stack.append(self.conv_int(args[0]))
-                except Exception:
-                    self.stack.append(None)
-            elif name == "try_conv_float":
-                if argc != 1:
-                    raise Exception("try_conv_float() must have exactly 1 argument")
-                try:
-                    self.stack.append(self.conv_float(args[0]))
-                except Exception:
-                    self.stack.append(None)
-            elif name == "try_conv_bool":
-                if argc != 1:
-                    raise Exception("try_conv_bool() must have exactly 1 argument")
-                try:
-                    self.stack.append(self.conv_bool(args[0]))
-                except Exception:
-                    self.stack.append(None)
-
-            elif name == "amount":
-                if argc != 1:
-                    raise Exception("amount() must have exactly 1 argument")
-                v = args[0]
-                if isinstance(v, (list, str)):
-                    self.stack.append(len(v))
-                else:
-                    raise Exception("amount() expects list or string")
-
-            elif name == "del":
-                if argc != 1:
-                    raise Exception("del() must have exactly 1 argument")
-                v = args[0]
-                if not isinstance(v, list):
-                    raise Exception("target not a list")
-                if len(v) == 0:
-                    raise Exception("del() on empty list")
-                self.stack.append(v.pop())
-
-            elif name == "upper":
-                if argc != 1:
-                    raise Exception("upper() must have exactly 1 argument")
-                self.stack.append(str(args[0]).upper())
-
-            elif name == "lower":
-                if argc != 1:
-                    raise Exception("lower() must have exactly 1 argument")
-                self.stack.append(str(args[0]).lower())
-
-            elif name == "split":
-                if argc != 2:
-                    raise Exception("split() must have exactly 2 arguments")
-                s = str(args[0])
-                sep = str(args[1])
-                self.stack.append(s.split(sep))
-
-            elif name == "join":
-                if argc != 2:
-                    raise Exception("join() must have exactly 2 arguments")
-                items = args[0]
-                sep = str(args[1])
-                if not isinstance(items, list):
-                    raise Exception("join() expects a list")
-                self.stack.append(sep.join(str(x) for x in items))
-
-            elif name == "replace":
-                if argc != 3:
-                    raise Exception("replace() must have exactly 3 arguments")
-                s = str(args[0])
-                old = str(args[1])
-                new = str(args[2])
-                self.stack.append(s.replace(old, new))
-
-            elif name == "insert":
-                if argc != 3:
-                    raise Exception("insert() must have exactly 3 arguments")
-                target = args[0]
-                index = args[1]
-                value = args[2]
-                if not isinstance(target, list):
-                    raise Exception("insert() expects a list")
-                if not isinstance(index, int):
-                    raise Exception("insert() index must be int")
-                if index < 0 or index > len(target):
-                    raise Exception("insert() index out of range")
-                target.insert(index, value)
-                self.stack.append(True)
-
-            elif name == "save":
-                if argc != 2:
-                    raise Exception("save() must have exactly 2 arguments")
-                path = self.resolve_path(str(args[0]))
-                text = str(args[1])
-                try:
-                    with open(path, "w", encoding="utf-8") as f:
-                        f.write(text)
-                except Exception:
-                    raise Exception(f"cannot write file: {path}")
-                self.stack.append(True)
-
-            elif name in ("append", "change"):
-                if argc != 2:
-                    raise Exception(f"{name}() must have exactly 2 arguments")
-                path = self.resolve_path(str(args[0]))
-                text = str(args[1])
-                try:
-                    with open(path, "a", encoding="utf-8") as f:
-                        f.write(text)
-                except Exception:
-                    raise Exception(f"cannot write file: {path}")
-                self.stack.append(True)
-
-            elif name in ("load", "read"):
-                if argc != 1:
-                    raise Exception(f"{name}() must have exactly 1 argument")
-                path = self.resolve_path(str(args[0]))
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        data = f.read()
-                except Exception:
-                    raise Exception(f"cannot read file: {path}")
-                self.stack.append(data)
-
-            else:
-                raise Exception(f"Unknown builtin: {name}")
-
+        else:
+            self.stack.pop()
             self.ip += 1
-            return False
-
-        if opcode == "CALL_FUNC":
-            arg_names = None
-            if isinstance(arg, tuple) and len(arg) == 3:
-                name, argc, arg_names = arg
-            else:
-                name, argc = arg
-            if name not in self.functions:
-                raise Exception(f"Unknown function: {name}")
-
-            meta = self.functions[name]
-            entry = meta.get("entry")
-            if entry is None:
-                raise Exception(f"Unknown function: {name}")
-
-            param_names = meta.get("params", [])
-            defaults = meta.get("defaults", {}) or {}
-            expected = len(param_names)
-
-            args = []
-            for _ in range(argc):
-                args.append(self.pop())
-            args.reverse()
-
-            if arg_names is not None:
-                if not isinstance(arg_names, list) or len(arg_names) != argc:
-                    raise Exception("Invalid call argument metadata")
-                positional = []
-                named = []
-                for nm, val in zip(arg_names, args, strict=False):
-                    if nm is None:
-                        positional.append(val)
-                    else:
-                        named.append((nm, val))
-            else:
-                positional = args
-                named = []
-
-            if len(positional) > expected:
-                raise Exception(f"{name}() expects at most {expected} positional arguments, got {len(positional)}")
-
-            assigned = {}
-            for i, val in enumerate(positional):
-                assigned[param_names[i]] = val
-
-            param_set = set(param_names)
-            for nm, val in named:
-                if nm not in param_set:
-                    raise Exception(f"{name}() got an unexpected named argument: {nm}")
-                if nm in assigned:
-                    raise Exception(f"{name}() got multiple values for argument: {nm}")
-                assigned[nm] = val
-
-            final_args = []
-            for pname in param_names:
-                if pname in assigned:
-                    final_args.append(assigned[pname])
-                elif pname in defaults:
-                    final_args.append(defaults[pname])
-                else:
-                    raise Exception(f"{name}() missing required argument: {pname}")
-
-            if len(self.call_stack) >= self.MAX_CALL_DEPTH:
-                raise Exception(f"Max call depth exceeded ({self.MAX_CALL_DEPTH})")
-
-            call_ip = self.ip
-            dbg = self._debug_at_ip(call_ip) or {}
-            self.call_stack.append({
-                "return_ip": self.ip + 1,
-                "caller_env": self.env,
-                "caller_func": self.current_function_name,
-                "caller_file": self.current_file_path,
-                "call_ip": call_ip,
-                "call_file": dbg.get("file"),
-                "call_line": dbg.get("line"),
-            })
-
-            local_env = {}
-            for i, pname in enumerate(param_names):
-                local_env[pname] = final_args[i]
-            self.env = local_env
-
-            self.current_function_name = name
-            self.current_file_path = meta.get("file") or self.current_file_path
-            self.check_ip(entry, "call")
-            self.ip = entry
-            return False
-
-        if opcode == "RETURN":
-            ret = self.pop() if self.stack else None
-            if not self.call_stack:
-                raise Exception("return used outside of a function")
-
-            meta = self.functions.get(self.current_function_name, {}) or {}
-            ret_type = meta.get("return_type")
-            if ret_type is not None:
-                self._check_return_type(self.current_function_name, ret, ret_type)
-
-            fr = self.call_stack.pop()
-            self.env = fr["caller_env"]
-            self.current_function_name = fr.get("caller_func", "<main>")
-            self.current_file_path = fr.get("caller_file")
+        return False
+
+    def _op_call_builtin(self, arg):
+        # Resolve the builtin once, then rewrite this instruction to CALL_BUILTIN_FAST.
+        name, argc = arg
+        fn = self._builtins.get(name)
+        if fn is None:
+            raise Exception(f"Unknown builtin: {name}")
+        arg = (fn, name, argc)
+        self.opcodes[self.ip] = Op.CALL_BUILTIN_FAST
+        self.args[self.ip] = arg
+        return self._op_call_builtin_fast(arg)
+
+    def _op_call_builtin_fast(self, arg):
+        fn, name, argc = arg
+        args = []
+        for _ in range(argc):
+            args.append(self.pop())
+        args.reverse()
+        fn(name, argc, args)
+        self.ip += 1
+        return False
+
+    def _op_call_func(self, arg, void=False):
+        arg_names = None
+        if isinstance(arg, tuple) and len(arg) == 3:
+            name, argc, arg_names = arg
+        else:
+            name, argc = arg
+        meta = self.functions.get(name)
+        if meta is None or meta.entry is None:
+            raise Exception(f"Unknown function: {name}")
+
+        # Linked functions are never redefined, so the lookup can be cached in the
+        # instruction itself; later executions go straight to CALL_FUNC_CACHED.
+        self.opcodes[self.ip] = Op.CALL_FUNC_CACHED
+        self.args[self.ip] = (meta, name, argc, arg_names, void)
+        return self._call_function(meta, name, argc, arg_names, void)
+
+    def _op_call_void(self, arg):
+        return self._op_call_func(arg, void=True)
+
+    def _op_call_func_cached(self, arg):
+        return self._call_function(*arg)
+
+    def _op_return(self, arg):
+        ret = self.pop() if self.stack else None
+        if not self.call_stack:
+            raise Exception("return used outside of a function")
+
+        # the callee's FuncMeta travels with its frame (no lookup by name)
+        ret_type = self.call_stack[-1]["meta"].return_type
+        if ret_type is not None:
+            self._check_return_type(self.current_function_name, ret, ret_type)
+
+        fr = self.call_stack.pop()
+        self.env = fr["caller_env"]
+        self.fast = fr["caller_fast"]
+        self.fast_names = fr["caller_fast_names"]
+        self.current_function_name = fr.get("caller_func", "<main>")
+        self.current_file_path = fr.get("caller_file")
+        if not fr["void"]:
             self.stack.append(ret)
-            self.ip = fr["return_ip"]
-            return False
-
-        if opcode == "IMPORT":
-            path = self.pop()
-            if not isinstance(path, str):
-                raise Exception("import path must be a string")
-            try:
-                alias = arg if isinstance(arg, str) else None
-                self.import_module(path, alias=alias)
-            except FallenImportError:
-                raise
-            except FallenRuntimeError as e:
-                raise FallenImportError(path, inner=e)
-            except Exception as e:
-                raise FallenImportError(path, inner=FallenRuntimeError(str(e), ip=self.ip, frames=self.build_stacktrace()))
-            self.ip += 1
-            return False
+        self.ip = fr["return_ip"]
+        return False
 
-        if opcode == "HALT":
-            return True
+    def _op_import(self, arg):
+        path = self.pop()
+        if not isinstance(path, str):
+            raise Exception("import path must be a string")
+        try:
+            alias = arg if isinstance(arg, str) else None
+            self.import_module(path, alias=alias)
+        except FallenImportError:
+            raise
+        except FallenRuntimeError as e:
+            raise FallenImportError(path, inner=e)
+        except Exception as e:
+            raise FallenImportError(path, inner=FallenRuntimeError(str(e), ip=self.ip, frames=self.build_stacktrace()))
+        self.ip += 1
+        return False
 
-        raise Exception(f"Unknown opcode: {opcode}")
+    def _op_halt(self, arg):
+        return True
 
     def run(self):
-        steps = 0
         entry_marked = False
         if self.entry_file_path:
             self.modules_loading.add((self.entry_file_path, None))
             entry_marked = True
         try:
-            while True:
-                if self.max_steps is not None:
+            # Hot loop: bind step once and only pay for the step-limit check when it is enabled.
+            step = self.step
+            max_steps = self.max_steps
+            if max_steps is None:
+                while not step():
+                    pass
+            else:
+                steps = 0
+                while True:
                     steps += 1
-                    if steps > self.max_steps:
+                    if steps > max_steps:
                         raise Exception("Step limit exceeded (possible infinite loop)")
-
-                halted = self.step()
-                if halted:
-                    break
+                    if step():
+                        break
             if entry_marked:
                 self.modules_loaded.add((self.entry_file_path, None))
         except FallenError: